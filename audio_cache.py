@@ -0,0 +1,224 @@
+import os
+import threading
+import numpy as np
+from transcription_cache import hash_audio
+
+
+# Répertoire du cache de l'audio décodé (PCM float32 mono 16 kHz au format .npy)
+AUDIO_CACHE_DIR = os.path.join("cache", "audio")
+
+# Taille maximale du cache sur disque (Mo) ; au-delà, les fichiers les moins récemment utilisés sont supprimés
+AUDIO_CACHE_SIZE_LIMIT_MB = 4000
+
+# Résolutions de la pyramide de crêtes (échantillons par case), chacune multiple de la précédente
+PEAK_BIN_SIZES = (256, 4096, 65536)
+
+_audio_cache_lock = threading.Lock()
+
+
+def _cache_path(key, suffix=".npy"):
+    """Chemin d'un fichier du cache pour une empreinte de fichier source."""
+    return os.path.join(AUDIO_CACHE_DIR, f"{key}{suffix}")
+
+
+def _open_memmap(path):
+    """Ouvre un fichier .npy en projection mémoire (copie à l'écriture, le fichier n'est jamais modifié)."""
+    try:
+        os.utime(path)  # Marquer l'entrée comme récemment utilisée
+    except OSError:
+        pass
+    return np.load(path, mmap_mode="c")
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def get_cached_audio(audio_path):
+    """Retourne l'audio décodé en projection mémoire s'il est déjà en cache, sinon None."""
+    path = _cache_path(hash_audio(audio_path))
+    if not os.path.exists(path):
+        return None
+    try:
+        return _open_memmap(path)
+    except (OSError, ValueError):
+        return None
+
+
+def write_npy_blocks(path, blocks):
+    """Écrit des blocs float32 successifs dans un fichier .npy 1-D, sans jamais les réunir en mémoire.
+
+    L'en-tête est écrit avec une longueur provisoire puis réécrit sur place une fois la longueur
+    connue (numpy réserve la place nécessaire dans l'en-tête pour faire grandir la dimension).
+
+    Returns:
+        int: Nombre d'échantillons écrits.
+    """
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)), "fortran_order": False, "shape": (0,)}
+    length = 0
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_1_0(f, header)
+        data_offset = f.tell()
+        for block in blocks:
+            block = np.ascontiguousarray(block, dtype=np.float32).reshape(-1)
+            block.tofile(f)
+            length += len(block)
+        f.seek(0)
+        header["shape"] = (length,)
+        np.lib.format.write_array_header_1_0(f, header)
+        if f.tell() != data_offset:
+            raise ValueError("En-tête .npy de taille inattendue après réécriture")
+    return length
+
+
+def get_decoded_audio(audio_path, decode_blocks):
+    """Retourne l'audio décodé du fichier, projeté en mémoire depuis le cache disque.
+
+    Au premier accès, les blocs produits par `decode_blocks(audio_path)` sont écrits au fil du
+    décodage dans un .npy, clé : empreinte du contenu du fichier source. La mémoire utilisée
+    dépend de la taille des blocs, pas de la durée de l'enregistrement. Les accès suivants ouvrent
+    ce fichier avec `np.memmap` : accès aléatoire immédiat sans décodage ni chargement complet.
+
+    Args:
+        audio_path (str): Chemin du fichier audio source.
+        decode_blocks (callable): Générateur de blocs float32 mono à 16 kHz successifs.
+    """
+    cached = get_cached_audio(audio_path)
+    if cached is not None:
+        return cached
+
+    key = hash_audio(audio_path)
+    path = _cache_path(key)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        write_npy_blocks(temp_path, decode_blocks(audio_path))
+        os.replace(temp_path, path)  # Écriture atomique
+    except (OSError, ValueError) as e:
+        print(f"Erreur lors de l'écriture dans le cache audio : {e}")
+        _remove_quietly(temp_path)
+        blocks = list(decode_blocks(audio_path))
+        return np.concatenate(blocks).astype(np.float32, copy=False) if blocks else np.zeros(0, dtype=np.float32)
+    except BaseException:
+        # Erreur de décodage : ne pas laisser de fichier partiel
+        _remove_quietly(temp_path)
+        raise
+
+    evict_audio_cache(keep=key)
+    return _open_memmap(path)
+
+
+def compute_peak_pyramid(audio, bin_sizes=PEAK_BIN_SIZES, block_bins=4096):
+    """Calcule les crêtes min/max de l'audio à plusieurs résolutions.
+
+    Seul le niveau le plus fin parcourt l'audio, par blocs (mémoire bornée, y compris pour un
+    tableau projeté en mémoire) ; chaque niveau suivant est réduit à partir du précédent.
+
+    Args:
+        audio (np.ndarray): Audio mono.
+        bin_sizes (tuple): Échantillons par case, chaque taille étant un multiple de la précédente.
+        block_bins (int): Nombre de cases du niveau le plus fin calculées par bloc.
+
+    Returns:
+        dict: {taille de case: tableau float32 (n, 2) des (min, max)}
+    """
+    finest = bin_sizes[0]
+    n_bins = -(-len(audio) // finest)
+    peaks = np.zeros((n_bins, 2), dtype=np.float32)
+    block = finest * block_bins
+    for start in range(0, len(audio), block):
+        chunk = np.asarray(audio[start:start + block], dtype=np.float32)
+        full = len(chunk) // finest
+        first = start // finest
+        bins = chunk[:full * finest].reshape(full, finest)
+        peaks[first:first + full, 0] = bins.min(axis=1)
+        peaks[first:first + full, 1] = bins.max(axis=1)
+        if full * finest < len(chunk):
+            # Dernière case incomplète
+            peaks[first + full] = chunk[full * finest:].min(), chunk[full * finest:].max()
+
+    pyramid = {finest: peaks}
+    for previous, size in zip(bin_sizes, bin_sizes[1:]):
+        factor = size // previous
+        lower = pyramid[previous]
+        count = -(-len(lower) // factor)
+        padded = np.concatenate([lower, np.repeat(lower[-1:], count * factor - len(lower), axis=0)])
+        grouped = padded.reshape(count, factor, 2)
+        pyramid[size] = np.stack([grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1)], axis=1)
+    return pyramid
+
+
+def get_peak_pyramid(audio_path, decode_blocks):
+    """Retourne la pyramide de crêtes du fichier, calculée une seule fois et stockée à côté de l'audio décodé.
+
+    Le fichier `{empreinte}.peaks.npz` partage l'empreinte de l'audio décodé : il est supprimé
+    en même temps que lui lors du nettoyage du cache.
+
+    Args:
+        audio_path (str): Chemin du fichier audio source.
+        decode_blocks (callable): Décodeur par blocs, utilisé si l'audio décodé n'est pas encore en cache.
+
+    Returns:
+        tuple: (pyramide {taille de case: (n, 2)}, nombre total d'échantillons)
+    """
+    key = hash_audio(audio_path)
+    path = _cache_path(key, ".peaks.npz")
+    if os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                pyramid = {int(name.split("_")[1]): data[name] for name in data.files if name.startswith("peaks_")}
+                return pyramid, int(data["length"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Pyramide de crêtes illisible, recalcul : {e}")
+
+    audio = get_decoded_audio(audio_path, decode_blocks)
+    pyramid = compute_peak_pyramid(audio)
+    try:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, length=len(audio), **{f"peaks_{size}": peaks for size, peaks in pyramid.items()})
+        os.replace(temp_path, path)  # Écriture atomique
+    except OSError as e:
+        print(f"Erreur lors de l'écriture de la pyramide de crêtes : {e}")
+    return pyramid, len(audio)
+
+
+def evict_audio_cache(limit_mb=None, keep=None):
+    """Supprime les entrées les moins récemment utilisées jusqu'à respecter la taille limite.
+
+    Tous les fichiers d'une même empreinte (audio décodé et données dérivées) sont supprimés ensemble.
+    L'entrée `keep` n'est jamais supprimée.
+    """
+    limit_bytes = (AUDIO_CACHE_SIZE_LIMIT_MB if limit_mb is None else limit_mb) * 1024 * 1024
+    with _audio_cache_lock:
+        if not os.path.isdir(AUDIO_CACHE_DIR):
+            return
+
+        # Regrouper les fichiers par empreinte : {clé: [dernier accès, taille totale, chemins]}
+        entries = {}
+        for entry in os.scandir(AUDIO_CACHE_DIR):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            stat = entry.stat()
+            group = entries.setdefault(entry.name.split(".")[0], [0.0, 0, []])
+            group[0] = max(group[0], stat.st_mtime)
+            group[1] += stat.st_size
+            group[2].append(entry.path)
+
+        total = sum(size for _, size, _ in entries.values())
+        for key, (_, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= limit_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                for path in paths:
+                    os.remove(path)
+                total -= size
+            except OSError as e:
+                # Fichier encore projeté en mémoire (Windows) : il sera supprimé plus tard
+                print(f"Erreur lors de la suppression de {key} du cache audio : {e}")
@@ -1,29 +1,368 @@
 import os
 from pathlib import Path
 from pyannote.audio import Pipeline
-from pydub import AudioSegment
 import whisperx
+import av
+import numpy as np
+import soundfile as sf
 import torch
-import io
+import gc
+import tempfile
+import threading
+import yaml
+from bisect import bisect_left
+from collections import OrderedDict
 from transformers import WhisperProcessor, WhisperForConditionalGeneration
+from transcription_cache import cached_call
+from audio_cache import get_decoded_audio, get_peak_pyramid
+from preprocessing import preprocess_audio_file, build_preprocessing_pipeline, BLOCK_SIZE
+from progress import ProgressTracker
+
+
+# Taille approximative des modèles Whisper en float16 (Mo), utilisée pour le budget mémoire du cache
+MODEL_SIZES_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 502,
+    "medium": 1420,
+    "large": 2870,
+}
+
+# Facteur appliqué à la taille float16 selon le type de calcul
+COMPUTE_TYPE_FACTORS = {
+    "float32": 2.0,
+    "float16": 1.0,
+    "int8_float16": 0.6,
+    "int8": 0.5,
+}
+
+# Fréquence d'échantillonnage attendue par WhisperX et pyannote
+SAMPLE_RATE = 16000
+
+# Durée de la fenêtre d'entrée fixe de Whisper (secondes)
+CHUNK_SECONDS = 30
+
+# Langue de transcription
+LANGUAGE = "fr"
+
+# Budget mémoire total (Mo) des modèles WhisperX gardés en cache
+MODEL_CACHE_BUDGET_MB = 6000
+
+# Part de chaque sous-étape de pyannote dans la durée de la diarisation (pour l'avancement)
+DIARIZATION_STEP_WEIGHTS = {
+    "segmentation": 0.3,
+    "speaker_counting": 0.05,
+    "embeddings": 0.6,
+    "discrete_diarization": 0.05,
+}
+
+_model_cache = OrderedDict()  # (model_name, device, compute_type) -> modèle, du moins au plus récemment utilisé
+_model_cache_lock = threading.Lock()  # Protège uniquement le dictionnaire (jamais tenu pendant un chargement)
+_model_loading = {}  # Clé -> Event signalé à la fin du chargement en cours de ce modèle
+
+
+def estimate_model_size_mb(model_name, compute_type):
+    """Estime l'occupation mémoire d'un modèle WhisperX (Mo)."""
+    base_size = MODEL_SIZES_MB.get(model_name.split(".")[0].split("-")[0], MODEL_SIZES_MB["large"])
+    return base_size * COMPUTE_TYPE_FACTORS.get(compute_type, 1.0)
+
+
+def _release_model(model):
+    """Libère la mémoire d'un modèle retiré du cache."""
+    del model
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _model_key(model_name, device=None, compute_type="float16"):
+    """Clé normalisée (model_name, device, compute_type) du cache de modèles."""
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    if device == "cpu" and compute_type == "float16":
+        # float16 n'est pas supporté par ctranslate2 sur CPU
+        compute_type = "int8"
+    return model_name, device, compute_type
+
+
+def get_whisperx_model(model_name="small", device=None, compute_type="float16", cpu_threads=None):
+    """Retourne un modèle WhisperX chargé une seule fois par processus.
+
+    Les modèles sont gardés dans un cache LRU clé (model_name, device, compute_type). Les modèles
+    les moins récemment utilisés sont déchargés quand le budget `MODEL_CACHE_BUDGET_MB` est dépassé.
+    `cpu_threads` fixe le nombre de threads intra-opération de ctranslate2 au premier chargement.
+    """
+    key = _model_key(model_name, device, compute_type)
+    model_name, device, compute_type = key
+
+    # Le verrou ne protège que le dictionnaire : un chargement long ne bloque ni les autres modèles
+    # en cache ni `list_cached_models`. Un seul thread charge une clé donnée, les autres l'attendent.
+    while True:
+        with _model_cache_lock:
+            if key in _model_cache:
+                _model_cache.move_to_end(key)
+                return _model_cache[key]
+            loading = _model_loading.get(key)
+            if loading is None:
+                _model_loading[key] = threading.Event()
+                break
+        loading.wait()  # Chargé par un autre thread (ou échec : nouvelle tentative ici)
 
+    try:
+        # Faire de la place avant le chargement pour ne pas dépasser le budget (chargements en cours compris)
+        evicted = []
+        with _model_cache_lock:
+            needed = estimate_model_size_mb(model_name, compute_type)
+            used = sum(estimate_model_size_mb(name, ctype) for name, _, ctype in _model_cache)
+            used += sum(estimate_model_size_mb(other[0], other[2]) for other in _model_loading if other != key)
+            while _model_cache and used + needed > MODEL_CACHE_BUDGET_MB:
+                evicted.append(_model_cache.popitem(last=False))
+                used -= estimate_model_size_mb(evicted[-1][0][0], evicted[-1][0][2])
+        while evicted:
+            old_name, old_device, old_ctype = evicted[0][0]
+            print(f"Déchargement du modèle WhisperX '{old_name}' ({old_device}, {old_ctype}) "
+                  "pour respecter le budget mémoire.")
+            _release_model(evicted.pop(0)[1])
+
+        print(f"Initialisation de WhisperX sur l'appareil : {device} avec le modèle : {model_name}")
+        options = {"threads": cpu_threads} if cpu_threads else {}
+        model = whisperx.load_model(model_name, device, compute_type=compute_type, language=LANGUAGE, **options)
+        print(f"Modèle WhisperX '{model_name}' chargé.")
+        with _model_cache_lock:
+            _model_cache[key] = model
+        return model
+    finally:
+        with _model_cache_lock:
+            _model_loading.pop(key).set()
+
+
+def deprioritize_model(model_name, device=None, compute_type="float16"):
+    """Place un modèle en cache en tête de la file d'éviction (premier déchargé si besoin)."""
+    key = _model_key(model_name, device, compute_type)
+    with _model_cache_lock:
+        if key in _model_cache:
+            _model_cache.move_to_end(key, last=False)
+
+
+def list_cached_models():
+    """Liste les modèles en cache sous la forme (model_name, device, compute_type, taille estimée en Mo)."""
+    with _model_cache_lock:
+        return [(name, device, ctype, estimate_model_size_mb(name, ctype)) for name, device, ctype in _model_cache]
+
+
+def unload_model(model_name=None, device=None, compute_type=None):
+    """Décharge les modèles en cache correspondant aux critères (tous si aucun critère).
 
-def transcribe_with_whisperx(audio_path, model_name="small", batch_size=16, compute_type="float16"):
-    """Transcription audio avec WhisperX."""
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Initialisation de WhisperX sur l'appareil : {device} avec le modèle : {model_name}")
+    Returns:
+        int: Nombre de modèles déchargés.
+    """
+    with _model_cache_lock:
+        keys = [
+            key for key in _model_cache
+            if (model_name is None or key[0] == model_name)
+            and (device is None or key[1] == device)
+            and (compute_type is None or key[2] == compute_type)
+        ]
+        evicted = [(key, _model_cache.pop(key)) for key in keys]
+    # Libération (gc, cache CUDA) hors du verrou
+    while evicted:
+        key = evicted[0][0]
+        print(f"Déchargement du modèle WhisperX '{key[0]}' ({key[1]}, {key[2]}).")
+        _release_model(evicted.pop(0)[1])
+    return len(keys)
+
+
+_decoded_audio = {}  # Dernier fichier décodé : {"key": (chemin, mtime), "audio": tableau 16 kHz}
+_decoded_audio_lock = threading.Lock()
+
+
+def decode_audio_blocks(audio_path):
+    """Décode un fichier audio trame par trame avec PyAV (blocs float32 mono à 16 kHz).
+
+    Le fichier n'est jamais chargé en entier : seule la trame en cours est en mémoire.
+    """
+    with av.open(audio_path) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                yield resampled.to_ndarray().reshape(-1)
+        for resampled in resampler.resample(None):
+            yield resampled.to_ndarray().reshape(-1)
+
+
+def load_audio_array(audio_path):
+    """Décode un fichier audio une seule fois en tableau NumPy float32 mono à 16 kHz.
+
+    Le résultat est projeté en mémoire depuis le cache disque de l'audio décodé (`audio_cache`),
+    rempli par blocs au premier accès (`decode_audio_blocks`) : une réouverture du même contenu ne
+    relance pas le décodage. Le dernier tableau est aussi gardé dans le processus.
+    """
+    key = (os.path.abspath(audio_path), os.path.getmtime(audio_path))
+    with _decoded_audio_lock:
+        if _decoded_audio.get("key") == key:
+            return _decoded_audio["audio"]
+
+        audio = get_decoded_audio(audio_path, decode_audio_blocks)
+        print(f"Fichier audio chargé depuis : {audio_path}")
+        _decoded_audio["key"] = key
+        _decoded_audio["audio"] = audio
+        return audio
+
+
+def load_peak_pyramid(audio_path):
+    """Pyramide de crêtes min/max du fichier pour l'affichage de la forme d'onde (voir `audio_cache`).
+
+    Returns:
+        tuple: (pyramide {échantillons par case: tableau (n, 2)}, nombre total d'échantillons à 16 kHz)
+    """
+    return get_peak_pyramid(audio_path, decode_audio_blocks)
 
-    # Chargement du modèle WhisperX
-    model = whisperx.load_model(model_name, device, compute_type=compute_type)
-    print(f"Modèle WhisperX '{model_name}' chargé.")
 
-    # Chargement de l'audio
-    audio = whisperx.load_audio(audio_path)
-    print(f"Fichier audio chargé depuis : {audio_path}")
+def prepare_audio(audio_path, preprocess=None):
+    """Tampon d'entrée (float32 mono 16 kHz) de l'ASR et de la diarisation.
 
-    # Transcription avec WhisperX
-    result = model.transcribe(audio, batch_size=batch_size, language="fr")
+    Sans prétraitement, l'audio décodé est repris du cache. Sinon, mono, rééchantillonnage,
+    passe-haut et normalisation sont appliqués en un seul passage par blocs sur le fichier.
+
+    Args:
+        audio_path (str): Chemin vers le fichier audio.
+        preprocess (dict, optional): Options de `preprocess_audio_file` ('high_pass', 'zero_phase',
+            'normalize' : False, 'peak' ou 'loudness').
+    """
+    if not preprocess or not any(preprocess.values()):
+        return load_audio_array(audio_path)
+
+    try:
+        return preprocess_audio_file(audio_path, SAMPLE_RATE, **preprocess)
+    except RuntimeError:
+        # Format non lu par libsndfile : décodage PyAV, puis mêmes étapes sur le tampon à 16 kHz
+        audio = load_audio_array(audio_path)
+        pipeline = build_preprocessing_pipeline(SAMPLE_RATE, SAMPLE_RATE, **preprocess)
+        blocks = (audio[i:i + BLOCK_SIZE] for i in range(0, len(audio), BLOCK_SIZE))
+        return pipeline.run(blocks, expected_length=len(audio))
+
+
+def get_audio_duration(audio_path):
+    """Durée d'un fichier audio en secondes, lue dans les métadonnées (sans décodage).
+
+    libsndfile donne la durée exacte des formats qu'il lit ; pour les autres (mp3, m4a...), la
+    durée vient du conteneur PyAV. Le décodage complet n'est qu'un dernier recours.
+    """
+    try:
+        return sf.info(audio_path).duration
+    except Exception:
+        pass
+    try:
+        with av.open(audio_path) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except (av.error.FFmpegError, IndexError) as e:
+        print(f"Durée illisible dans les métadonnées de {audio_path} : {e}")
+    return len(load_audio_array(audio_path)) / SAMPLE_RATE
+
+
+def slice_audio(audio, start, end):
+    """Retourne la vue (sans copie) du tableau audio entre `start` et `end` secondes."""
+    start_idx = max(int(start * SAMPLE_RATE), 0)
+    end_idx = min(int(end * SAMPLE_RATE), len(audio))
+    return audio[start_idx:end_idx]
+
+
+def build_speaker_preview(audio, intervals, max_seconds=30.0, crossfade_seconds=0.02):
+    """Assemble les intervalles d'un locuteur en un seul extrait, en une passe vectorisée.
+
+    Les intervalles sont mis bout à bout dans l'ordre chronologique avec un fondu enchaîné
+    linéaire de `crossfade_seconds` entre deux extraits (0 pour une simple concaténation),
+    et l'extrait final est limité à `max_seconds`.
+
+    Args:
+        audio (np.ndarray): Audio décodé (mono float32 à 16 kHz), éventuellement projeté en mémoire.
+        intervals (list): Intervalles (start, end) en secondes.
+        max_seconds (float): Durée maximale de l'extrait.
+        crossfade_seconds (float): Durée des fondus enchaînés.
+
+    Returns:
+        np.ndarray: Extrait float32 (vide si aucun intervalle n'est exploitable).
+    """
+    bounds = np.array(sorted(intervals), dtype=np.float64).reshape(-1, 2)
+    starts = np.clip((bounds[:, 0] * SAMPLE_RATE).astype(np.int64), 0, len(audio))
+    ends = np.clip((bounds[:, 1] * SAMPLE_RATE).astype(np.int64), 0, len(audio))
+    keep = ends > starts
+    starts, lengths = starts[keep], (ends - starts)[keep]
+    if len(lengths) == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    # Fondu limité à la moitié du plus court extrait
+    fade = min(int(crossfade_seconds * SAMPLE_RATE), int(lengths.min()) // 2)
+
+    # Limiter la durée : garder les premiers extraits et tronquer le dernier
+    max_samples = int(max_seconds * SAMPLE_RATE)
+    output_starts = np.concatenate(([0], np.cumsum(lengths - fade)[:-1]))
+    count = int(np.searchsorted(output_starts, max_samples, side="left"))
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    starts, lengths, output_starts = starts[:count], lengths[:count].copy(), output_starts[:count]
+    lengths[-1] = min(lengths[-1], max_samples - output_starts[-1])
+    if count > 1 and lengths[-1] <= fade:
+        # Dernier extrait entièrement recouvert par le fondu : l'écarter
+        starts, lengths, output_starts = starts[:-1], lengths[:-1], output_starts[:-1]
+        count -= 1
+
+    # Indices source et destination de chaque échantillon, et position dans son extrait
+    piece = np.repeat(np.arange(count), lengths)
+    offsets = np.arange(len(piece)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    source = starts[piece] + offsets
+    target = output_starts[piece] + offsets
+
+    # Enveloppe des fondus : montée en début d'extrait (sauf le premier), descente en fin (sauf le dernier),
+    # les deux rampes se recouvrant avec un gain total constant
+    gain = np.ones(len(piece), dtype=np.float64)
+    if fade > 0:
+        fade_in = (offsets < fade) & (piece > 0)
+        gain[fade_in] = (offsets[fade_in] + 1) / (fade + 1)
+        remaining = lengths[piece] - offsets
+        fade_out = (remaining <= fade) & (piece < count - 1)
+        gain[fade_out] = remaining[fade_out] / (fade + 1)
+
+    preview = np.bincount(target, weights=audio[source] * gain, minlength=int(target.max()) + 1)
+    return preview.astype(np.float32)
+
+
+def transcribe_segments_with_whisperx(audio_path, model_name="small", batch_size=16, compute_type="float16"):
+    """Transcription WhisperX retournant les segments horodatés ('start', 'end', 'text').
+
+    `audio_path` peut être un chemin de fichier ou un tableau NumPy déjà décodé à 16 kHz.
+    """
+    # Récupération du modèle WhisperX (chargé une seule fois par processus)
+    model = get_whisperx_model(model_name, compute_type=compute_type)
+
+    # Chargement de l'audio (sauf s'il est déjà décodé)
+    if isinstance(audio_path, np.ndarray):
+        audio = audio_path
+    else:
+        audio = load_audio_array(audio_path)
+
+    # Transcription avec WhisperX (inférence VAD par lots)
+    result = model.transcribe(audio, batch_size=batch_size, language=LANGUAGE)
     print("Transcription réalisée avec succès.")
+    return result["segments"]
+
+
+def transcribe_with_whisperx(audio_path, model_name="small", batch_size=16, compute_type="float16", use_cache=True):
+    """Transcription audio avec WhisperX (chemin de fichier ou tableau NumPy à 16 kHz)."""
+    if use_cache:
+        _, device, compute_type = _model_key(model_name, compute_type=compute_type)
+        settings = {"model_name": model_name, "device": device, "compute_type": compute_type, "language": LANGUAGE}
+        return cached_call(
+            "transcribe_with_whisperx", audio_path, settings,
+            lambda: transcribe_with_whisperx(audio_path, model_name, batch_size, compute_type, use_cache=False)
+        )
+
+    result = {"segments": transcribe_segments_with_whisperx(audio_path, model_name, batch_size, compute_type)}
 
     # Collecte des segments transcrits
     transcriptions = []
@@ -33,6 +372,54 @@ def transcribe_with_whisperx(audio_path, model_name="small", batch_size=16, comp
 
     return transcriptions
 
+def transcribe_turns_batched(audio, turns, model_name="small", batch_size=16, compute_type="float16",
+                             progress_callback=None):
+    """Transcrit plusieurs tours de parole en une inférence WhisperX par lots.
+
+    Chaque tour est découpé en fenêtres d'au plus `CHUNK_SECONDS` secondes ; toutes les fenêtres
+    sont envoyées ensemble au modèle, `batch_size` fenêtres par passe, puis les textes sont
+    regroupés par tour.
+
+    Args:
+        audio (np.ndarray): Audio décodé à 16 kHz (éventuellement projeté en mémoire).
+        turns (list): Tours (start, end, speaker).
+        progress_callback (callable, optional): Appelée avec l'avancement entre 0 et 1 après chaque fenêtre.
+
+    Returns:
+        list: Pour chaque tour, la liste des textes transcrits (même format que `transcribe_with_whisperx`).
+    """
+    model = get_whisperx_model(model_name, compute_type=compute_type)
+    chunk_samples = CHUNK_SECONDS * SAMPLE_RATE
+
+    # Indice du tour de chaque fenêtre, dans l'ordre des tours
+    owners = []
+    for turn_idx, (start, end, _) in enumerate(turns):
+        n_samples = len(slice_audio(audio, start, end))
+        owners.extend([turn_idx] * -(-n_samples // chunk_samples))
+
+    def windows():
+        # Les tours ne sont extraits qu'au moment où le modèle en a besoin
+        for start, end, _ in turns:
+            segment_audio = slice_audio(audio, start, end)
+            for offset in range(0, len(segment_audio), chunk_samples):
+                yield {"inputs": segment_audio[offset:offset + chunk_samples]}
+
+    texts = [[] for _ in turns]
+    outputs = model(windows(), batch_size=batch_size, num_workers=0)
+    for done, (turn_idx, output) in enumerate(zip(owners, outputs), start=1):
+        text = output["text"]
+        if batch_size in (0, 1, None):
+            # Sans lot, le pipeline transformers ne dépaquette pas : liste d'un seul texte (comme WhisperX)
+            text = text[0]
+        if text.strip():
+            texts[turn_idx].append(text)
+            print(f"Segment transcrit : {text}")
+        if progress_callback is not None:
+            progress_callback(done / len(owners))
+
+    return texts
+
+
 def clean_brackets(transcriptions):
     """
     Supprime les crochets au début et à la fin des transcriptions.
@@ -62,26 +449,140 @@ def transcribe_with_medical_whisper(audio_path, model_path="/path/to/Medical-Whi
     print(f"Transcription avec Medical-Whisper : {transcription}")
     return transcription
 
+def _resolve_config_paths(path_to_config: Path) -> Path:
+    """Écrit une copie de la configuration Pyannote où les chemins relatifs sont rendus absolus.
+
+    Évite de changer le répertoire de travail du processus (os.chdir), ce qui perturberait
+    les autres threads de l'interface.
+    """
+    base_dir = path_to_config.parent.resolve()
+
+    def resolve(value):
+        if isinstance(value, dict):
+            return {key: resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        if isinstance(value, str) and not os.path.isabs(value) and (base_dir / value).exists():
+            return str(base_dir / value)
+        return value
+
+    with open(path_to_config, "r", encoding="utf-8") as f:
+        config = resolve(yaml.safe_load(f))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False, encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+    return Path(f.name)
+
+
 def load_pipeline_from_pretrained(path_to_config: str | Path) -> Pipeline:
     """Charge le pipeline Pyannote en local."""
     path_to_config = Path(path_to_config)
 
     print(f"Chargement du pipeline Pyannote depuis : {path_to_config}")
-    cwd = Path.cwd().resolve()  # Répertoire de travail actuel
-    cd_to = path_to_config.parent  # Répertoire contenant le fichier de configuration
+    resolved_config = _resolve_config_paths(path_to_config)
+    try:
+        # Charger le pipeline depuis le fichier local (chemins absolus, sans os.chdir)
+        pipeline = Pipeline.from_pretrained(resolved_config)
+    finally:
+        os.remove(resolved_config)
 
-    # Changer de répertoire pour garantir les chemins relatifs
-    print(f"Changement du répertoire de travail vers : {cd_to}")
-    os.chdir(cd_to)
+    return pipeline
 
-    # Charger le pipeline depuis le fichier local
-    pipeline = Pipeline.from_pretrained(path_to_config)
 
-    # Revenir au répertoire de travail initial
-    print(f"Retour au répertoire initial : {cwd}")
-    os.chdir(cwd)
+# Chemin vers la configuration locale du pipeline de diarisation
+DIARIZATION_CONFIG_PATH = r"D:/fasterwhisper/Fasterwhisper/models/pyannote_diarization_config.yaml"
+
+_pipeline_cache = {}  # (chemin de configuration, device) -> Pipeline
+_pipeline_cache_lock = threading.Lock()
+
+
+def get_diarization_pipeline(path_to_config=DIARIZATION_CONFIG_PATH, device=None) -> Pipeline:
+    """Retourne le pipeline Pyannote chargé une seule fois par configuration et par appareil."""
+    if not os.path.isfile(path_to_config):
+        raise FileNotFoundError(f"Configuration de diarisation introuvable : {path_to_config}")
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    key = (str(Path(path_to_config).resolve()), device)
+
+    with _pipeline_cache_lock:
+        if key not in _pipeline_cache:
+            pipeline = load_pipeline_from_pretrained(path_to_config)
+
+            # Déplacer vers GPU si disponible
+            if device == "cuda":
+                pipeline.to(torch.device("cuda"))
+            else:
+                print("CUDA non disponible. Utilisation du CPU.")
+            _pipeline_cache[key] = pipeline
+        return _pipeline_cache[key]
+
+
+def preload_diarization_pipeline(path_to_config=DIARIZATION_CONFIG_PATH):
+    """Charge le pipeline Pyannote en arrière-plan (thread démon).
+
+    Returns:
+        threading.Thread: Le thread de préchargement.
+    """
+    def worker():
+        try:
+            get_diarization_pipeline(path_to_config)
+            print("Pipeline Pyannote préchargé.")
+        except Exception as e:
+            print(f"Erreur pendant le préchargement du pipeline Pyannote : {e}")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+def assign_speakers(segments, merged_turns):
+    """Associe chaque segment transcrit au tour de parole qui le recouvre le plus.
+
+    Args:
+        segments (list): Segments WhisperX (dictionnaires avec 'start', 'end' et 'text').
+        merged_turns (list): Tours (start, end, speaker) issus de `merge_consecutive_speakers`.
+
+    Returns:
+        list: Tuples (start, end, speaker, textes) dans le même format que le mode par segment.
+    """
+    turns = sorted(merged_turns)
+    if not turns:
+        return []
+    starts = [start for start, _, _ in turns]
+
+    # Maximum cumulé des fins pour arrêter la recherche vers la gauche (tours éventuellement chevauchants)
+    max_ends = []
+    current_max = float("-inf")
+    for _, end, _ in turns:
+        current_max = max(current_max, end)
+        max_ends.append(current_max)
+
+    texts = [[] for _ in turns]
+    for segment in segments:
+        seg_start, seg_end = segment["start"], segment["end"]
+        best_idx, best_overlap = None, 0.0
+
+        # Les tours candidats commencent avant la fin du segment
+        idx = bisect_left(starts, seg_end) - 1
+        while idx >= 0 and max_ends[idx] > seg_start:
+            overlap = min(seg_end, turns[idx][1]) - max(seg_start, turns[idx][0])
+            if overlap > best_overlap:
+                best_idx, best_overlap = idx, overlap
+            idx -= 1
+
+        if best_idx is None:
+            # Aucun recouvrement : rattacher le segment au tour le plus proche
+            right = bisect_left(starts, seg_start)
+            candidates = [i for i in (right - 1, right) if 0 <= i < len(turns)]
+            best_idx = min(
+                candidates,
+                key=lambda i: max(turns[i][0] - seg_end, seg_start - turns[i][1], 0.0)
+            )
+
+        texts[best_idx].append(segment["text"])
+
+    return [(start, end, speaker, texts[i]) for i, (start, end, speaker) in enumerate(turns)]
 
-    return pipeline
 
 def filter_short_lines(transcriptions, min_length=2):
     """Filtre les transcriptions pour ne garder que les lignes avec au moins `min_length` caractères."""
@@ -109,7 +610,25 @@ def merge_consecutive_speakers(diarization):
     return merged_segments
 
 
-def process_audio(audio_path, diarization_enabled, token=None, model_name="small"):
+def _encode_process_result(result):
+    """Convertit le résultat de `process_audio` en valeur JSON pour le cache."""
+    transcriptions, speaker_files = result
+    return {"transcriptions": transcriptions, "speaker_files": speaker_files}
+
+
+def _decode_process_result(value):
+    """Reconstruit le résultat de `process_audio` (tuples) depuis le cache."""
+    transcriptions = [tuple(item) if isinstance(item, list) else item for item in value["transcriptions"]]
+    speaker_files = {
+        speaker: [tuple(interval) for interval in intervals]
+        for speaker, intervals in value["speaker_files"].items()
+    }
+    return transcriptions, speaker_files
+
+
+def process_audio(audio_path, diarization_enabled, token=None, model_name="small", single_pass=False, batch_size=16,
+                  use_cache=True, preprocess=None, progress_callback=None, diarization_config=DIARIZATION_CONFIG_PATH,
+                  audio_duration=None):
     """Traite un fichier audio avec ou sans diarisation.
 
     Args:
@@ -117,72 +636,143 @@ def process_audio(audio_path, diarization_enabled, token=None, model_name="small
         diarization_enabled (bool): Si la diarisation est activée.
         token (str, optional): Jeton pour authentification si nécessaire.
         model_name (str, optional): Nom du modèle Whisper à utiliser.
+        single_pass (bool, optional): Transcrire le fichier entier en une passe puis attribuer
+            les segments aux locuteurs par recouvrement temporel.
+        batch_size (int, optional): Taille des lots pour l'inférence WhisperX.
+        use_cache (bool, optional): Réutiliser un résultat précédent pour le même contenu audio
+            et les mêmes paramètres (cache persistant sur disque).
+        preprocess (dict, optional): Prétraitement en un passage avant l'ASR et la diarisation,
+            par exemple {"high_pass": True, "zero_phase": True, "normalize": "loudness"}.
+        progress_callback (callable, optional): Appelée avec (étape, avancement global entre 0 et 1,
+            temps restant estimé en secondes) pendant le décodage, la diarisation, la transcription
+            et l'export ; l'estimation repose sur la vitesse mesurée lors des traitements précédents.
+        diarization_config (str, optional): Configuration locale du pipeline Pyannote.
+        audio_duration (float, optional): Durée de l'audio si elle est déjà connue (sinon lue
+            dans les métadonnées du fichier pour l'estimation du temps restant).
 
     Returns:
         list: Liste des transcriptions ou segments.
-        dict: Dictionnaire des fichiers audio par locuteur (si diarisation activée).
+        dict: Intervalles (start, end) en secondes par locuteur (si diarisation activée).
     """
     try:
-        if not diarization_enabled:
-            # Transcription sans diarisation
-            print("Diarisation désactivée. Utilisation de WhisperX.")
-            transcription = transcribe_with_whisperx(audio_path, model_name=model_name)
-            return transcription, {}
-
+        _, device, compute_type = _model_key(model_name)
+        progress = None
+        if progress_callback is not None:
+            stages = ["decode", "diarization", "transcription", "export"] if diarization_enabled else \
+                ["decode", "transcription", "export"]
+            mode = ("single_pass" if single_pass else "turns") if diarization_enabled else "plain"
+            profile = f"{model_name}/{device}/{compute_type}/{mode}"
+            if audio_duration is None:
+                audio_duration = get_audio_duration(audio_path)
+            progress = ProgressTracker(stages, audio_duration, profile, progress_callback)
+
+        if use_cache:
+            settings = {
+                "model_name": model_name,
+                "device": device,
+                "compute_type": compute_type,
+                "language": LANGUAGE,
+                "diarization_enabled": bool(diarization_enabled),
+                "single_pass": bool(single_pass) and bool(diarization_enabled),
+                "diarization_config": diarization_config if diarization_enabled else None,
+                "preprocess": {key: "peak" if value is True and key == "normalize" else value
+                               for key, value in (preprocess or {}).items() if value},
+            }
+            result = cached_call(
+                "process_audio", audio_path, settings,
+                lambda: _process_audio(audio_path, diarization_enabled, model_name, single_pass, batch_size,
+                                       preprocess, progress, diarization_config),
+                encode=_encode_process_result, decode=_decode_process_result
+            )
         else:
-            # Configuration pour le pipeline de diarisation
-            CONFIG_PATH = r"D:/fasterwhisper/Fasterwhisper/models/pyannote_diarization_config.yaml"  # Chemin vers votre config
-            pipeline = load_pipeline_from_pretrained(CONFIG_PATH)
+            result = _process_audio(audio_path, diarization_enabled, model_name, single_pass, batch_size,
+                                    preprocess, progress, diarization_config)
 
-            # Déplacer vers GPU si disponible
-            if torch.cuda.is_available():
-                pipeline.to(torch.device("cuda"))
-            else:
-                print("CUDA non disponible. Utilisation du CPU.")
-
-            # Charger l'audio dans un buffer
-            with open(audio_path, 'rb') as f:
-                audio_data = io.BytesIO(f.read())
+        if progress is not None:
+            progress.finish()
+        return result
 
-            # Effectuer la diarisation
-            diarization = pipeline(audio_data)
-            merged_diarization = merge_consecutive_speakers(diarization)
+    except Exception as e:
+        print(f"Erreur pendant le traitement de l'audio : {str(e)}")
+        return None, None
 
-            # Charger l'audio entier avec pydub
-            audio = AudioSegment.from_file(audio_path)
-            speaker_files = {}
-            transcriptions = []
 
-            # Créer un répertoire temporaire
-            temp_dir = "temp"
-            if not os.path.exists(temp_dir):
-                os.makedirs(temp_dir)
+def _diarization_hook(progress):
+    """Hook pyannote traduisant l'avancement de ses sous-étapes en avancement de l'étape de diarisation."""
+    steps = list(DIARIZATION_STEP_WEIGHTS)
 
-            # Traiter chaque segment identifié
-            for start, end, speaker in merged_diarization:
-                start_ms = int(start * 1000)  # Conversion en millisecondes
-                end_ms = int(end * 1000)
+    def hook(step_name, step_artifact, file=None, total=None, completed=None):
+        if step_name not in DIARIZATION_STEP_WEIGHTS:
+            return
+        done = sum(DIARIZATION_STEP_WEIGHTS[step] for step in steps[:steps.index(step_name)])
+        fraction = completed / total if total and completed is not None else 1.0
+        progress.update("diarization", done + DIARIZATION_STEP_WEIGHTS[step_name] * fraction)
 
-                # Extraire le segment audio
-                segment_audio = audio[start_ms:end_ms]
-                temp_file = os.path.join(temp_dir, f"temp_{speaker}_{start_ms}_{end_ms}.wav")
-                segment_audio.export(temp_file, format="wav")
+    return hook
 
-                # Ajouter le fichier au dictionnaire des locuteurs
-                if speaker not in speaker_files:
-                    speaker_files[speaker] = []
-                speaker_files[speaker].append(temp_file)
 
-                # Transcrire chaque segment
-                result = transcribe_with_whisperx(temp_file, model_name=model_name)
-                transcriptions.append((start, end, speaker, result))
+def _process_audio(audio_path, diarization_enabled, model_name, single_pass, batch_size, preprocess=None,
+                   progress=None, diarization_config=DIARIZATION_CONFIG_PATH):
+    """Traitement effectif de `process_audio` (sans cache).
 
+    `progress` (ProgressTracker, optional) reçoit l'avancement de chaque étape.
+    """
+    def report(stage, fraction):
+        if progress is not None:
+            progress.update(stage, fraction)
+
+    if not diarization_enabled:
+        # Transcription sans diarisation
+        print("Diarisation désactivée. Utilisation de WhisperX.")
+        report("decode", 0.0)
+        audio = prepare_audio(audio_path, preprocess)
+        report("transcription", 0.0)
+        transcription = transcribe_with_whisperx(audio, model_name=model_name, batch_size=batch_size,
+                                                 use_cache=False)
+        report("export", 0.0)
+        return transcription, {}
+
+    else:
+        # Pipeline de diarisation (chargé une seule fois, puis réutilisé)
+        pipeline = get_diarization_pipeline(diarization_config)
+
+        # Décoder l'audio une seule fois (16 kHz float32, projeté en mémoire depuis le cache disque) :
+        # le même tampon sert à pyannote et à WhisperX, chaque tour étant une vue de ce tableau.
+        report("decode", 0.0)
+        audio = prepare_audio(audio_path, preprocess)
+
+        # Effectuer la diarisation (tenseur partageant la mémoire du tableau NumPy, sans copie)
+        report("diarization", 0.0)
+        options = {"hook": _diarization_hook(progress)} if progress is not None else {}
+        waveform = torch.from_numpy(audio).unsqueeze(0)
+        diarization = pipeline({"waveform": waveform, "sample_rate": SAMPLE_RATE}, **options)
+        merged_diarization = merge_consecutive_speakers(diarization)
+
+        # Intervalles (start, end) par locuteur ; les extraits ne sont écrits qu'à la lecture
+        speaker_files = {}
+        for start, end, speaker in merged_diarization:
+            speaker_files.setdefault(speaker, []).append((start, end))
+
+        report("transcription", 0.0)
+        if single_pass:
+            # Transcription du fichier entier en une seule passe, puis jointure par recouvrement
+            segments = transcribe_segments_with_whisperx(audio, model_name=model_name, batch_size=batch_size)
+            report("export", 0.0)
+            transcriptions = assign_speakers(segments, merged_diarization)
             print("Traitement terminé.")
             return transcriptions, speaker_files
 
-    except Exception as e:
-        print(f"Erreur pendant le traitement de l'audio : {str(e)}")
-        return None, None
+        # Transcrire tous les segments identifiés par lots (vues audio, sans fichier temporaire)
+        results = transcribe_turns_batched(audio, merged_diarization, model_name=model_name, batch_size=batch_size,
+                                           progress_callback=lambda fraction: report("transcription", fraction))
+        report("export", 0.0)
+        transcriptions = [
+            (start, end, speaker, result)
+            for (start, end, speaker), result in zip(merged_diarization, results)
+        ]
+
+        print("Traitement terminé.")
+        return transcriptions, speaker_files
 
 
 
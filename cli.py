@@ -0,0 +1,314 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import multiprocessing
+import torch
+from audio_processing import (process_audio, get_whisperx_model, get_diarization_pipeline, get_audio_duration,
+                              DIARIZATION_CONFIG_PATH)
+from progress import format_eta
+
+
+# Extensions audio prises en compte lors du parcours d'un répertoire
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg", ".flac", ".m4a")
+
+OUTPUT_FORMATS = ("json", "srt", "txt")
+
+# Intervalle minimal (secondes) entre deux affichages de l'avancement d'une même étape
+PROGRESS_PRINT_INTERVAL = 5.0
+
+
+def _glob_root(pattern):
+    """Partie fixe (sans caractère générique) d'un motif glob : racine des chemins relatifs en sortie."""
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if any(char in part for char in "*?["):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or "."
+
+
+def collect_audio_files(inputs):
+    """Développe les fichiers, répertoires et motifs glob en une liste ordonnée de fichiers audio.
+
+    Returns:
+        list: Couples (chemin, nom de sortie) ; le nom de sortie est le chemin relatif à l'entrée
+            d'origine (répertoire parcouru ou partie fixe du motif), sans extension.
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, names in os.walk(item):
+                dirs.sort()
+                files.extend((os.path.join(root, name), item) for name in sorted(names)
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif os.path.isfile(item):
+            files.append((item, os.path.dirname(item) or "."))
+        else:
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+            if not matches:
+                print(f"Aucun fichier trouvé pour : {item}")
+            files.extend((path, _glob_root(item)) for path in matches)
+
+    # Supprimer les doublons en conservant l'ordre
+    seen = set()
+    entries = []
+    for path, root in files:
+        if os.path.abspath(path) in seen:
+            continue
+        seen.add(os.path.abspath(path))
+        entries.append((path, os.path.splitext(os.path.relpath(path, root))[0]))
+    return entries
+
+
+def assign_output_bases(entries, output_dir):
+    """Chemins de sortie (sans extension) par fichier, sous `output_dir`, sans collision.
+
+    Deux fichiers menant au même nom (par exemple `a.wav` et `a.mp3` dans un même répertoire)
+    reçoivent un suffixe numérique au lieu de s'écraser.
+    """
+    bases = {}
+    used = set()
+    for path, name in entries:
+        base = os.path.join(output_dir, name)
+        candidate, index = base, 2
+        while os.path.normcase(os.path.abspath(candidate)) in used:
+            candidate = f"{base}_{index}"
+            index += 1
+        if candidate != base:
+            print(f"Nom de sortie déjà utilisé pour {path} : résultats écrits dans {candidate}.*")
+        used.add(os.path.normcase(os.path.abspath(candidate)))
+        bases[path] = candidate
+    return bases
+
+
+def segment_text(text):
+    """Texte d'un segment (liste de morceaux transcrits ou chaîne)."""
+    if isinstance(text, list):
+        return " ".join(part.strip() for part in text).strip()
+    return text.strip()
+
+
+def format_srt_time(seconds):
+    """Convertit des secondes au format SRT 'HH:MM:SS,mmm'."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+
+
+def write_outputs(transcriptions, output_base, formats):
+    """Écrit les transcriptions d'un fichier dans les formats demandés.
+
+    Returns:
+        list: Chemins des fichiers écrits.
+    """
+    diarized = bool(transcriptions) and isinstance(transcriptions[0], tuple)
+    written = []
+
+    if "json" in formats:
+        if diarized:
+            data = [{"start": start, "end": end, "speaker": spk, "text": segment_text(text)}
+                    for start, end, spk, text in transcriptions]
+        else:
+            data = [{"text": segment_text(text)} for text in transcriptions]
+        path = f"{output_base}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        written.append(path)
+
+    if "txt" in formats:
+        path = f"{output_base}.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            if diarized:
+                for start, end, spk, text in transcriptions:
+                    f.write(f"{start} - {end}: {spk}\n{segment_text(text)}\n\n")
+            else:
+                for text in transcriptions:
+                    f.write(f"{segment_text(text)}\n\n")
+        written.append(path)
+
+    if "srt" in formats:
+        if diarized:
+            path = f"{output_base}.srt"
+            with open(path, "w", encoding="utf-8") as f:
+                for index, (start, end, spk, text) in enumerate(transcriptions, start=1):
+                    f.write(f"{index}\n{format_srt_time(start)} --> {format_srt_time(end)}\n"
+                            f"{spk}: {segment_text(text)}\n\n")
+            written.append(path)
+        else:
+            print("Format SRT ignoré : les horodatages ne sont disponibles qu'avec la diarisation.")
+
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Transcription et diarisation par lots, sans interface graphique."
+    )
+    parser.add_argument("inputs", nargs="+", help="Fichiers audio, répertoires ou motifs glob.")
+    parser.add_argument("-o", "--output-dir", default="outputs", help="Répertoire des résultats.")
+    parser.add_argument("-f", "--formats", default="json,srt,txt",
+                        help="Formats de sortie séparés par des virgules (json, srt, txt).")
+    parser.add_argument("-m", "--model", default="small", help="Modèle Whisper à utiliser.")
+    parser.add_argument("--batch-size", type=int, default=16, help="Taille des lots pour l'inférence WhisperX.")
+    parser.add_argument("--no-diarization", action="store_true", help="Désactiver la séparation des locuteurs.")
+    parser.add_argument("--diarization-config", default=DIARIZATION_CONFIG_PATH,
+                        help="Fichier YAML de configuration locale du pipeline Pyannote.")
+    parser.add_argument("--single-pass", action="store_true",
+                        help="Transcrire chaque fichier en une passe puis attribuer les locuteurs.")
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas utiliser le cache des transcriptions.")
+    parser.add_argument("--no-progress", action="store_true", help="Ne pas afficher l'avancement par étape.")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Nombre de processus de transcription (mode CPU). Chaque processus garde son modèle.")
+    args = parser.parse_args(argv)
+
+    if not args.no_diarization and not os.path.isfile(args.diarization_config):
+        parser.error(f"Configuration de diarisation introuvable : {args.diarization_config} "
+                     "(indiquer --diarization-config ou --no-diarization)")
+    if args.batch_size < 1:
+        parser.error("--batch-size doit être au moins 1")
+
+    args.formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in args.formats if fmt not in OUTPUT_FORMATS]
+    if unknown:
+        parser.error(f"Formats inconnus : {', '.join(unknown)}")
+    return args
+
+
+_worker_options = {}  # Options de traitement du processus courant (fixées par `init_worker`)
+_worker_error = []    # Erreur d'initialisation du processus courant (chaque fichier est alors en échec)
+
+
+def init_worker(options, cpu_threads):
+    """Initialise un processus de travail : threads CPU et chargement unique des modèles.
+
+    Une erreur de chargement n'est pas propagée : un initialiseur de `multiprocessing.Pool` qui
+    échoue est relancé sans fin. Elle est conservée et chaque fichier est signalé en échec.
+    """
+    _worker_options.update(options)
+    torch.set_num_threads(cpu_threads)
+    try:
+        get_whisperx_model(options["model_name"], cpu_threads=cpu_threads)
+        if options["diarization_enabled"]:
+            get_diarization_pipeline(options["diarization_config"])
+    except Exception as e:
+        print(f"Erreur pendant le chargement des modèles : {e}")
+        _worker_error.append(str(e))
+
+
+def make_progress_printer(audio_path):
+    """Retourne un rappel d'avancement affichant chaque étape, puis au plus toutes les `PROGRESS_PRINT_INTERVAL` s."""
+    name = os.path.basename(audio_path)
+    state = {"stage": None, "time": 0.0}
+
+    def report(stage, fraction, eta):
+        now = time.perf_counter()
+        if stage == "done" or (stage == state["stage"] and now - state["time"] < PROGRESS_PRINT_INTERVAL):
+            return
+        state.update(stage=stage, time=now)
+        print(f"  {name} : {stage} {fraction:.0%}, reste ~{format_eta(eta)}", flush=True)
+
+    return report
+
+
+def process_file(audio_path):
+    """Traite un fichier avec les options du processus courant.
+
+    Returns:
+        tuple: (chemin, transcriptions ou None, durée de traitement, durée audio)
+    """
+    if _worker_error:
+        print(f"  {os.path.basename(audio_path)} ignoré : modèles non chargés ({_worker_error[0]}).")
+        return audio_path, None, 0.0, 0.0
+
+    options = dict(_worker_options)
+    if options.pop("show_progress", False):
+        options["progress_callback"] = make_progress_printer(audio_path)
+
+    start_time = time.perf_counter()
+    # Durée lue une seule fois (métadonnées) : estimation du temps restant et RTF affiché
+    duration = get_audio_duration(audio_path)
+    transcriptions, _ = process_audio(audio_path, audio_duration=duration, **options)
+    elapsed = time.perf_counter() - start_time
+    return audio_path, transcriptions, elapsed, duration if transcriptions is not None else 0.0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {
+        "diarization_enabled": not args.no_diarization,
+        "model_name": args.model,
+        "single_pass": args.single_pass,
+        "batch_size": args.batch_size,
+        "diarization_config": args.diarization_config,
+        "use_cache": not args.no_cache,
+        "show_progress": not args.no_progress,
+    }
+
+    entries = collect_audio_files(args.inputs)
+    files = [path for path, _ in entries]
+    output_bases = assign_output_bases(entries, args.output_dir)
+    if not files:
+        print("Aucun fichier audio à traiter.")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    workers = max(1, min(args.workers, len(files)))
+    # Répartir les cœurs entre les processus (threads intra-opération ctranslate2 × processus ≈ cœurs)
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Charger les modèles une seule fois pour tout le lot (une fois par processus en mode multi-processus)
+    load_start = time.perf_counter()
+    pool = None
+    if workers > 1:
+        # Chaque processus tire le fichier suivant dès qu'il est libre (chunksize=1),
+        # et les résultats sont restitués dans l'ordre des fichiers
+        pool = multiprocessing.get_context("spawn").Pool(workers, initializer=init_worker,
+                                                         initargs=(options, cpu_threads))
+        results = pool.imap(process_file, files, chunksize=1)
+        print(f"{workers} processus de transcription démarrés ({cpu_threads} threads chacun).")
+    else:
+        init_worker(options, os.cpu_count() or 1)
+        results = map(process_file, files)
+        if not _worker_error:
+            print(f"Modèles chargés en {time.perf_counter() - load_start:.1f} s.")
+
+    failures = 0
+    total_audio = 0.0
+    total_processing = 0.0
+    try:
+        for index, (audio_path, transcriptions, elapsed, duration) in enumerate(results, start=1):
+            print(f"[{index}/{len(files)}] {audio_path}")
+            if transcriptions is None:
+                failures += 1
+                print(f"  Échec après {elapsed:.1f} s.")
+                continue
+
+            # Arborescence des entrées reproduite sous le répertoire de sortie
+            output_base = output_bases[audio_path]
+            os.makedirs(os.path.dirname(output_base), exist_ok=True)
+            written = write_outputs(transcriptions, output_base, args.formats)
+
+            total_audio += duration
+            total_processing += elapsed
+            rtf = elapsed / duration if duration > 0 else 0.0
+            print(f"  {duration:.1f} s d'audio traitées en {elapsed:.1f} s (RTF {rtf:.3f}) -> {', '.join(written)}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    wall_time = time.perf_counter() - load_start
+    if total_audio > 0:
+        print(f"Total : {len(files) - failures}/{len(files)} fichiers, {total_audio:.1f} s d'audio en "
+              f"{wall_time:.1f} s (RTF {wall_time / total_audio:.3f}, "
+              f"{total_processing:.1f} s de traitement cumulé).")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
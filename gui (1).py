@@ -2,19 +2,61 @@ import os
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import filedialog
-from audio_processing import process_audio, clean_temp_files
+from audio_processing import (process_audio, clean_temp_files, list_cached_models, unload_model,
+                              load_audio_array, load_peak_pyramid, build_speaker_preview,
+                              preload_diarization_pipeline, SAMPLE_RATE,
+                              get_whisperx_model, deprioritize_model)
+from live_transcription import LiveTranscriber
+from preprocessing import HighPassFilter, Resample
+from recorder import StreamingRecorder, BlockRingBuffer
+from waveform_view import WaveformView
+from progress import format_eta
+from transcript_index import TranscriptIndex
 import torch
 import threading
 import vlc
-import time
 import pyaudio
-import wave
 import numpy as np
 import soundfile as sf
+import re
+import queue
 import shutil
 from tkinter.ttk import Progressbar
 from tkinter import messagebox
 
+# Fréquence de capture utilisée si le micro ne supporte pas directement la fréquence des modèles
+FALLBACK_CAPTURE_RATE = 44100
+
+# Fichiers écrits pendant l'enregistrement en direct
+LIVE_SESSION_FILE = "live_session.wav"
+LIVE_ARCHIVE_FILE = "live_session_full_rate.wav"
+
+# Capture en mode callback : taille des blocs PortAudio et nombre de blocs pouvant attendre le traitement
+CAPTURE_BLOCK_FRAMES = 1024
+CAPTURE_QUEUE_BLOCKS = 256
+
+# Intervalle (ms) entre deux lectures de la position de lecture (curseur et surlignage du segment en cours)
+PLAYBACK_POLL_MS = 200
+
+# Attente maximale (ms) du démarrage de VLC avant de positionner la lecture
+PLAYBACK_START_TIMEOUT_MS = 2000
+
+# Intervalle (ms) entre deux applications des événements envoyés par les threads de travail
+UI_PUMP_INTERVAL_MS = 50
+
+# Événements d'état dont seul le plus récent de chaque lot est appliqué
+COALESCED_UI_EVENTS = ("status", "model_status", "progress")
+
+# Libellés des étapes du traitement affichés avec la barre de progression
+STAGE_LABELS = {
+    "decode": "Decoding audio",
+    "diarization": "Diarization",
+    "transcription": "Transcription",
+    "export": "Export",
+    "done": "Finishing",
+}
+
+
 class DiarizationApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -30,17 +72,57 @@ class DiarizationApp(ctk.CTk):
 
         self.audio_path = None
         self.transcriptions = []
-        self.speaker_mapping = {}
+        self.speaker_mapping = {}   # Locuteur (étiquette d'origine) -> nom affiché
+        self.speaker_index = {}     # Locuteur -> indices de ses segments, dans l'ordre d'apparition
+        self.speaker_order = []     # Locuteurs dans l'ordre de la liste affichée
+        self.transcript_index = TranscriptIndex()  # Intervalles de temps <-> lignes de la zone de texte
+        self.highlighted_segment = None
         self.speaker_files = {}
+        self.speaker_previews = {}  # Extraits assemblés par locuteur, créés à la première sélection
+        self.processed_audio_path = None  # Fichier dont proviennent `speaker_files` (dernier traitement)
+        self.preview_lock = threading.Lock()
         self.model_choice = tk.StringVar(value="small")  # Default model
         self.number_of_speakers = tk.StringVar(value="Auto")
 
+        # File des événements d'interface : les threads de travail n'accèdent jamais directement aux widgets
+        self.ui_events = queue.SimpleQueue()
+        self.ui_handlers = {
+            "status": self.apply_status,
+            "model_status": self.apply_model_status,
+            "progress": self.apply_progress,
+            "live_result": self.apply_live_result,
+            "waveform": self.apply_waveform,
+            "processing_result": self.apply_processing_result,
+            "processing_finished": self.apply_processing_finished,
+        }
+
         self.create_widgets()
         self.check_cuda_availability()
+        self.after(UI_PUMP_INTERVAL_MS, self.pump_ui_events)
+
+        # Chargement du pipeline de diarisation en arrière-plan pendant que l'utilisateur choisit un fichier
+        preload_diarization_pipeline()
+
+        # Préchargement du modèle WhisperX sélectionné dans un thread dédié
+        self.preload_request = None  # Dernier modèle demandé ; les demandes plus anciennes sont ignorées
+        self.preload_lock = threading.Lock()
+        self.preload_event = threading.Event()
+        self.preload_thread = threading.Thread(target=self.preload_worker, daemon=True)
+        self.preload_thread.start()
+        self.preload_model(self.model_choice.get())
+
         self.current_position = 0
+        self.pending_seek = None  # Identifiant `after` du positionnement en attente du démarrage de VLC
         self.is_recording = False
         self.audio_stream = None
-        self.audio_frames = []
+        self.session_recorder = None
+        self.live_transcriber = None
+        self.live_high_pass = None
+        self.stream_resampler = None
+        self.capture_rate = SAMPLE_RATE
+        self.keep_archive = False
+        self.archive_recorder = None
+        self.capture_buffer = None
 
     def create_widgets(self):
         # Cadre gauche
@@ -90,10 +172,34 @@ class DiarizationApp(ctk.CTk):
         )
         stop_button.pack(side=tk.LEFT, padx=10, pady=10)
 
+        # Transcription au fil de l'enregistrement en direct
+        self.live_transcription_enabled = tk.BooleanVar(value=False)
+        self.live_transcription_toggle = ctk.CTkSwitch(
+            left_frame, text="Live transcription while recording", variable=self.live_transcription_enabled,
+            onvalue=True, offvalue=False
+        )
+        self.live_transcription_toggle.pack(pady=5)
+
+        # Copie d'archive à pleine fréquence (44,1 kHz) en plus de l'enregistrement à 16 kHz
+        self.archive_enabled = tk.BooleanVar(value=False)
+        self.archive_toggle = ctk.CTkSwitch(
+            left_frame, text="Keep full-rate archive copy", variable=self.archive_enabled, onvalue=True,
+            offvalue=False
+        )
+        self.archive_toggle.pack(pady=5)
+
+        # Diagnostic de la capture : débordements, échantillons perdus et remplissage de la file
+        self.capture_stats_label = ctk.CTkLabel(left_frame, text="", font=("Arial", 11))
+        self.capture_stats_label.pack(pady=2)
+
         # Cadre pour les contrôles audio en dessous
         audio_controls_frame = ctk.CTkFrame(left_frame)
         audio_controls_frame.pack( fill="x", padx=10, pady=10)
 
+        # Forme d'onde avec les pistes de locuteurs (zoom à la molette, clic pour se positionner)
+        self.waveform_view = WaveformView(audio_controls_frame, samplerate=SAMPLE_RATE, on_seek=self.seek_to)
+        self.waveform_view.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
         # Label pour afficher la position en minutes:secondes
         self.audio_slider_label = ctk.CTkLabel(audio_controls_frame, text="0m0s", font=("Arial", 12))
         self.audio_slider_label.pack(side=tk.TOP, pady=5)
@@ -153,6 +259,38 @@ class DiarizationApp(ctk.CTk):
 
         self.postprocessing_enabled.trace_add("write", lambda *args: self.process_and_normalize_audio())
 
+        # Mode de normalisation : pic ou niveau RMS (loudness)
+        self.normalize_mode = tk.StringVar(value="peak")
+        self.normalize_mode_menu = ctk.CTkOptionMenu(
+            left_frame,
+            variable=self.normalize_mode,
+            values=["peak", "loudness"],
+            command=lambda value: self.process_and_normalize_audio()
+        )
+        self.normalize_mode_menu.pack(pady=5)
+
+        # Filtre passe-haut (bruits de manipulation, ronflements) : fichiers en post-processing et enregistrement direct
+        self.high_pass_enabled = tk.BooleanVar(value=False)
+        self.high_pass_toggle = ctk.CTkSwitch(
+            left_frame,
+            text="High-pass filter (80 Hz)",
+            variable=self.high_pass_enabled,
+            onvalue=True,
+            offvalue=False
+        )
+        self.high_pass_toggle.pack(pady=5)
+
+        # Passe-haut sans déphasage (fichiers uniquement ; l'enregistrement direct reste causal)
+        self.zero_phase_enabled = tk.BooleanVar(value=False)
+        self.zero_phase_toggle = ctk.CTkSwitch(
+            left_frame,
+            text="Zero-phase high-pass",
+            variable=self.zero_phase_enabled,
+            onvalue=True,
+            offvalue=False
+        )
+        self.zero_phase_toggle.pack(pady=5)
+
         self.model_label = ctk.CTkLabel(left_frame, text="Select the model for Speech To Text")
         self.model_label.pack(pady=10)  # Assurez que ce widget est bien ajouté avec pack
 
@@ -199,6 +337,13 @@ class DiarizationApp(ctk.CTk):
         # Ajustez la position de la boîte de sélection
         num_speakers_menu.grid(row=0, column=2, padx=(5, 0))  # Place après le label
 
+        # Transcription du fichier entier en une passe, puis attribution des locuteurs
+        self.single_pass_enabled = tk.BooleanVar(value=False)
+        self.single_pass_toggle = ctk.CTkSwitch(
+            left_frame, text="Single-pass transcription", variable=self.single_pass_enabled, onvalue=True,
+            offvalue=False
+        )
+        self.single_pass_toggle.pack(pady=5)
 
         self.process_button = ctk.CTkButton(left_frame, text="Start Processing", command=self.start_processing,
                                             state="disabled")
@@ -215,6 +360,12 @@ class DiarizationApp(ctk.CTk):
         self.cuda_status_label = ctk.CTkLabel(left_frame, text="Checking CUDA availability...")
         self.cuda_status_label.pack(pady=10)
 
+        self.model_status_label = ctk.CTkLabel(left_frame, text="")
+        self.model_status_label.pack(pady=5)
+
+        self.models_button = ctk.CTkButton(left_frame, text="Loaded Models", command=self.show_loaded_models)
+        self.models_button.pack(pady=5)
+
         # Panneau de droite
         right_frame = ctk.CTkFrame(self, border_width=2, corner_radius=10,
                                    fg_color="#003366")  # Bordure et couleur de fond
@@ -238,6 +389,10 @@ class DiarizationApp(ctk.CTk):
         transcription_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.transcription_text.config(yscrollcommand=transcription_scrollbar.set)
 
+        # Surlignage du segment en cours de lecture ; un clic sur un segment y positionne la lecture
+        self.transcription_text.tag_configure("current_segment", background="#35506B")
+        self.transcription_text.bind("<ButtonRelease-1>", self.on_transcript_click)
+
         # Section intermédiaire : Entrée pour le prompt
         prompt_frame = ctk.CTkFrame(right_frame, fg_color="#003366", corner_radius=10)  # Style pour le prompt
         prompt_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
@@ -267,6 +422,7 @@ class DiarizationApp(ctk.CTk):
 
         self.speaker_listbox = tk.Listbox(listbox_frame, height=8, selectmode=tk.SINGLE, font=("Arial", 14))
         self.speaker_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.speaker_listbox.bind("<<ListboxSelect>>", self.on_speaker_selected)
 
         self.scrollbar = tk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.speaker_listbox.yview)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -294,6 +450,7 @@ class DiarizationApp(ctk.CTk):
             current_color = self.start_button.cget("fg_color")
             new_color = "#FF0000" if current_color != "#FF0000" else "#333333"
             self.start_button.configure(fg_color=new_color)
+            self.update_capture_stats()
             # Relancer la fonction après 500 ms
             self.after(500, self.toggle_record_button_color)
         else:
@@ -308,14 +465,15 @@ class DiarizationApp(ctk.CTk):
         if confirm:
             # Réinitialiser les variables et widgets
             self.audio_path = None
-            self.transcriptions = []
             self.speaker_mapping = {}
             self.speaker_files = {}
+            self.speaker_previews = {}
+            self.processed_audio_path = None
             self.current_position = 0
             self.audio_slider.set(0)
             self.audio_slider_label.configure(text="0m0s")
-            self.transcription_text.delete("1.0", tk.END)
-            self.populate_speaker_list()
+            self.set_transcriptions([])
+            self.waveform_view.clear()
             self.audio_label.configure(text="Interface réinitialisée.")
             if hasattr(self, 'vlc_player'):
                 self.vlc_player.stop()
@@ -358,28 +516,58 @@ class DiarizationApp(ctk.CTk):
             self.audio_label.configure(text="No speaker selected.")
             return
 
-        # Récupérer le nom du locuteur sélectionné
-        selected_speaker = self.speaker_listbox.get(selection[0])
+        # Récupérer le locuteur sélectionné
+        selected_speaker = self.speaker_order[selection[0]]
+        display_name = self.speaker_display_name(selected_speaker)
 
-        # Récupérer les fichiers associés au locuteur
-        audio_files = self.speaker_files.get(selected_speaker)
+        # Récupérer les intervalles associés au locuteur
+        intervals = self.speaker_files.get(selected_speaker)
 
-        if not audio_files:
-            self.audio_label.configure(text=f"No audio files found for {selected_speaker}.")
+        if not intervals:
+            self.audio_label.configure(text=f"No audio files found for {display_name}.")
             return
 
-        # Jouer le premier fichier du locuteur
-        speaker_audio_path = audio_files[0]
         try:
+            # Extrait déjà préparé à la sélection, sinon assemblé maintenant
+            speaker_audio_path = self.get_speaker_preview(selected_speaker)
+
             if not hasattr(self, 'vlc_player') or self.vlc_player is None:
                 self.vlc_player = vlc.MediaPlayer(speaker_audio_path)
             else:
                 self.vlc_player.set_mrl(speaker_audio_path)
 
             self.vlc_player.play()
-            self.audio_label.configure(text=f"Playing segment for: {selected_speaker}")
+            self.audio_label.configure(text=f"Playing segment for: {display_name}")
         except Exception as e:
             self.audio_label.configure(text=f"Error playing speaker audio: {str(e)}")
+
+    def on_speaker_selected(self, event=None):
+        """Prépare en arrière-plan l'extrait du locuteur sélectionné pour une lecture immédiate."""
+        selection = self.speaker_listbox.curselection()
+        if not selection:
+            return
+        speaker = self.speaker_order[selection[0]]
+        if self.speaker_files.get(speaker) and speaker not in self.speaker_previews:
+            threading.Thread(target=self.get_speaker_preview, args=(speaker,), daemon=True).start()
+
+    def get_speaker_preview(self, speaker):
+        """Retourne le fichier de l'extrait assemblé d'un locuteur, en le créant au premier appel."""
+        with self.preview_lock:
+            path = self.speaker_previews.get(speaker)
+            if path is not None and os.path.exists(path):
+                return path
+
+            # Tous les tours du locuteur, assemblés depuis l'audio décodé en cache (projection mémoire).
+            # Les intervalles viennent du dernier traitement : lire ce fichier-là, pas celui chargé depuis.
+            audio = load_audio_array(self.processed_audio_path)
+            preview = build_speaker_preview(audio, self.speaker_files[speaker])
+            safe_name = re.sub(r"[^\w-]+", "_", speaker)
+            path = os.path.join("temp", f"preview_{safe_name}.wav")
+            os.makedirs("temp", exist_ok=True)
+            sf.write(path, preview, SAMPLE_RATE)
+            self.speaker_previews[speaker] = path
+            return path
+
     def update_audio_slider(self):
         """Met à jour le slider en fonction de la position actuelle de l'audio."""
         if self.vlc_player.is_playing():
@@ -395,48 +583,24 @@ class DiarizationApp(ctk.CTk):
         """Méthode placeholder pour la génération de résumé."""
         pass
     def process_and_normalize_audio(self):
-        """Traite et normalise un fichier audio si le post-processing est activé."""
+        """Indique le prétraitement appliqué au prochain traitement (un seul passage, sans fichier intermédiaire)."""
         if not self.audio_path:
             self.audio_label.configure(text="No audio file to process.")
             return
 
-        try:
-            # Vérifier si le post-processing est activé
-            if self.postprocessing_enabled.get():
-                # Chargement du fichier audio
-                data, samplerate = sf.read(self.audio_path)
-
-                # Si le fichier est stéréo, convertissez-le en mono (moyenne des canaux)
-                if len(data.shape) > 1:
-                    data = np.mean(data, axis=1)
-
-                # Normalisation des niveaux audio entre -1 et 1
-                max_amplitude = np.max(np.abs(data))
-                if max_amplitude > 0:
-                    data = data / max_amplitude
-
-                # Sauvegarde du fichier normalisé
-                normalized_file = "normalized_audio.wav"
-                sf.write(normalized_file, data, samplerate)
-
-                # Mettre à jour le chemin pour pointer vers le fichier normalisé
-                self.audio_path = normalized_file
-                self.audio_label.configure(text=f"Audio normalized and saved as {normalized_file}")
-
-            else:
-                # Si désactivé, récupérer le fichier original
-                if os.path.exists("original_audio.wav"):
-                    self.audio_path = "original_audio.wav"
-                    self.audio_label.configure(text="Using the original audio file.")
-                else:
-                    self.audio_label.configure(text="Original file not found. Normalization disabled.")
-
-            # Réinitialisation du lecteur VLC avec le fichier actuel (normalisé ou original)
-            self.vlc_player = vlc.MediaPlayer(self.audio_path)
-            self.process_button.configure(state="normal")
-
-        except Exception as e:
-            self.audio_label.configure(text=f"Error during processing: {str(e)}")
+        if self.postprocessing_enabled.get():
+            mode = self.normalize_mode.get()
+            self.audio_label.configure(text=f"Audio will be normalized ({mode}) during processing.")
+        else:
+            self.audio_label.configure(text="Using the original audio file.")
+
+    def get_preprocessing_options(self):
+        """Options du pipeline de prétraitement selon les commutateurs de l'interface."""
+        return {
+            "high_pass": self.high_pass_enabled.get(),
+            "zero_phase": self.high_pass_enabled.get() and self.zero_phase_enabled.get(),
+            "normalize": self.normalize_mode.get() if self.postprocessing_enabled.get() else False,
+        }
 
     def update_audio_progress(self):
         """Met à jour le curseur et le temps en fonction de la position actuelle."""
@@ -450,30 +614,76 @@ class DiarizationApp(ctk.CTk):
                 slider_position = (current_time / total_length) * 100
                 self.audio_slider.set(slider_position)
 
+            self.waveform_view.set_position(current_time)
+            self.highlight_segment_at(current_time)
+
             # Mettre à jour le label du temps
             minutes = int(current_time // 60)
             seconds = int(current_time % 60)
             self.audio_slider_label.configure(text=f"{minutes}m{seconds}s")
 
-            # Relancer la mise à jour après 500 ms
-            self.after(500, self.update_audio_progress)
+            # Relancer la mise à jour
+            self.after(PLAYBACK_POLL_MS, self.update_audio_progress)
 
     def on_slider_release(self, event):
         """Reprend la lecture à la position définie par le curseur."""
-        if self.audio_path and hasattr(self, 'vlc_player'):
+        if self.audio_path and getattr(self, 'vlc_player', None) is not None:
             try:
                 # Convertir la position en millisecondes
                 new_position_ms = int(self.current_position * 1000)
-                self.vlc_player.set_time(new_position_ms)
+                if self.pending_seek is not None:
+                    self.after_cancel(self.pending_seek)
+                    self.pending_seek = None
 
-                # Reprendre la lecture
-                if not self.vlc_player.is_playing():
+                if self.vlc_player.is_playing():
+                    self.vlc_player.set_time(new_position_ms)
+                else:
+                    # libvlc ignore set_time() tant que la lecture n'a pas démarré : lancer, puis positionner
                     self.vlc_player.play()
+                    self.set_time_when_playing(new_position_ms, PLAYBACK_START_TIMEOUT_MS)
 
                 self.audio_label.configure(
                     text=f"Playing from {int(self.current_position // 60)}m{int(self.current_position % 60)}s.")
             except Exception as e:
                 self.audio_label.configure(text=f"Error setting new position: {str(e)}")
+
+    def seek_to(self, seconds):
+        """Reprend la lecture à la position cliquée (forme d'onde ou transcription)."""
+        self.current_position = seconds
+        self.waveform_view.set_position(seconds)
+        self.highlight_segment_at(seconds)
+        self.audio_slider_label.configure(text=self.format_duration(seconds))
+        self.on_slider_release(None)
+
+    def set_time_when_playing(self, position_ms, remaining_ms):
+        """Positionne la lecture dès que VLC joue, puis relance le suivi de la position (sans bloquer Tk)."""
+        self.pending_seek = None
+        if getattr(self, 'vlc_player', None) is None:
+            return
+        if self.vlc_player.is_playing():
+            self.vlc_player.set_time(position_ms)
+            self.update_audio_progress()
+        elif remaining_ms > 0:
+            self.pending_seek = self.after(
+                PLAYBACK_POLL_MS // 4,
+                lambda: self.set_time_when_playing(position_ms, remaining_ms - PLAYBACK_POLL_MS // 4)
+            )
+
+    def load_waveform(self, audio_path, speaker_files):
+        """Charge la pyramide de crêtes (calculée une seule fois par fichier) et l'affiche avec les pistes."""
+        try:
+            pyramid, total_samples = load_peak_pyramid(audio_path)
+        except Exception as e:
+            print(f"Erreur lors du calcul de la forme d'onde : {e}")
+            return
+
+        self.post_ui_event("waveform", pyramid, total_samples, speaker_files)
+
+    def apply_waveform(self, pyramid, total_samples, speaker_files):
+        """Affiche la forme d'onde et les pistes de locuteurs."""
+        self.waveform_view.set_peaks(pyramid, total_samples)
+        self.waveform_view.set_speaker_lanes(speaker_files)
+
     def update_audio_position(self, value):
         """Mise à jour de la position de lecture en fonction du curseur."""
         try:
@@ -509,28 +719,129 @@ class DiarizationApp(ctk.CTk):
 
         self.is_recording = True
         self.toggle_record_button_color()
-        self.audio_frames = []
 
-        # Configuration de PyAudio
+        # Configuration de PyAudio : capture directe à la fréquence des modèles (16 kHz) si possible,
+        # sinon à 44,1 kHz avec rééchantillonnage polyphase dans le thread de capture
         self.audio = pyaudio.PyAudio()
-        self.audio_stream = self.audio.open(
+        keep_archive = self.archive_enabled.get()
+        if not keep_archive and self.is_capture_rate_supported(SAMPLE_RATE):
+            self.capture_rate = SAMPLE_RATE
+        else:
+            self.capture_rate = FALLBACK_CAPTURE_RATE
+        self.stream_resampler = Resample(self.capture_rate, SAMPLE_RATE) if self.capture_rate != SAMPLE_RATE else None
+        self.keep_archive = keep_archive
+
+        # Écriture au fil de l'eau sur disque : mémoire constante et fichier lisible même après un plantage
+        self.session_recorder = StreamingRecorder(LIVE_SESSION_FILE, SAMPLE_RATE)
+        self.archive_recorder = StreamingRecorder(LIVE_ARCHIVE_FILE, self.capture_rate) if keep_archive else None
+
+        # File préallouée alimentée par le callback PortAudio, vidée par le thread de traitement
+        self.capture_buffer = BlockRingBuffer(CAPTURE_QUEUE_BLOCKS, CAPTURE_BLOCK_FRAMES)
+
+        # Filtre passe-haut appliqué au flux pendant la capture (état conservé d'un bloc à l'autre)
+        self.live_high_pass = HighPassFilter(SAMPLE_RATE) if self.high_pass_enabled.get() else None
+
+        # Transcription incrémentale avec le modèle en cache
+        self.live_transcriber = None
+        if self.live_transcription_enabled.get():
+            self.transcription_text.delete("1.0", tk.END)
+            self.live_transcriber = LiveTranscriber(
+                self.model_choice.get(), input_rate=SAMPLE_RATE, on_segment=self.on_live_segment
+            )
+
+        self.audio_stream = self.open_input_stream()
+        self.audio_label.configure(text=f"Recording started ({self.capture_rate} Hz).")
+
+        # Lance le thread pour capturer l'audio
+        self.recording_thread = threading.Thread(target=self.record_audio)
+        self.recording_thread.start()
+
+    def is_capture_rate_supported(self, rate):
+        """Vérifie si le micro par défaut accepte une capture mono 16 bits à `rate` Hz."""
+        try:
+            device = self.audio.get_default_input_device_info()
+            return self.audio.is_format_supported(
+                rate, input_device=device["index"], input_channels=1, input_format=pyaudio.paInt16
+            )
+        except (ValueError, IOError):
+            return False
+
+    def open_input_stream(self):
+        """Ouvre le flux d'entrée PyAudio en mode callback à la fréquence de capture choisie."""
+        return self.audio.open(
             format=pyaudio.paInt16,
             channels=1,
-            rate=44100,
+            rate=self.capture_rate,
             input=True,
-            frames_per_buffer=1024
+            frames_per_buffer=CAPTURE_BLOCK_FRAMES,
+            stream_callback=self.on_audio_captured
         )
-        self.audio_label.configure(text="Recording started.")
 
-        # Lance le thread pour capturer l'audio
-        self.recording_thread = threading.Thread(target=self.record_audio)
-        self.recording_thread.start()
+    def on_audio_captured(self, in_data, frame_count, time_info, status):
+        """Callback PortAudio : copie le bloc dans la file préallouée, sans traitement ni verrou."""
+        if status & pyaudio.paInputOverflow:
+            self.capture_buffer.overruns += 1
+        self.capture_buffer.put(in_data)
+        return None, pyaudio.paContinue
+
+    def update_capture_stats(self):
+        """Affiche les compteurs de la capture en cours."""
+        buffer = self.capture_buffer
+        if buffer is None:
+            return
+        self.capture_stats_label.configure(
+            text=f"Overruns: {buffer.overruns} | Dropped frames: {buffer.dropped_frames} | "
+                 f"Queue: {buffer.depth()}/{buffer.capacity} (max {buffer.max_depth})",
+            text_color="orange" if buffer.overruns or buffer.dropped_frames else "gray"
+        )
+
+    def process_captured_block(self, samples):
+        """Ramène un bloc capturé (float32) à 16 kHz, le filtre et l'ajoute à l'enregistrement."""
+        if self.stream_resampler is not None:
+            samples = self.stream_resampler.process(samples)
+        if self.live_high_pass is not None:
+            samples = self.live_high_pass.process(samples)
+        if len(samples) == 0:
+            return
+        data = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        self.session_recorder.write(data)
+        if self.live_transcriber is not None:
+            self.live_transcriber.feed(data)
 
     def record_audio(self):
-        """Capturer l'audio tant que l'enregistrement est actif."""
-        while self.is_recording:
-            data = self.audio_stream.read(1024)
-            self.audio_frames.append(data)
+        """Traite les blocs capturés tant que l'enregistrement est actif, puis vide la file."""
+        while self.is_recording or self.capture_buffer.depth():
+            block = self.capture_buffer.get(timeout=0.1)
+            if block is None:
+                continue
+            if self.archive_recorder is not None:
+                self.archive_recorder.write(block.tobytes())
+            self.process_captured_block(block.astype(np.float32) / 32768.0)
+
+    def on_live_segment(self, start, end, text):
+        """Transmet un segment transcrit en direct à l'interface (appelé depuis le thread de transcription)."""
+        self.post_ui_event("live_segment", start, end, text)
+
+    def apply_live_segments(self, segments):
+        """Affiche d'un seul bloc les segments transcrits en direct reçus depuis la dernière mise à jour."""
+        for start, end, text in segments:
+            self.insert_segment(start, end, "Speaker 1", [text])
+        self.transcription_text.see(tk.END)
+
+    def finish_live_transcription(self):
+        """Termine la transcription en direct et la conserve comme résultat de la session."""
+        # Attendre que le thread de capture ait fini d'alimenter le transcripteur
+        self.recording_thread.join(timeout=2)
+        segments = self.live_transcriber.finish()
+        self.live_transcriber = None
+
+        self.post_ui_event("live_result", segments)
+
+    def apply_live_result(self, segments):
+        """Conserve la transcription en direct comme résultat de la session."""
+        self.set_transcriptions([(start, end, "Speaker 1", [text]) for start, end, text in segments])
+        self.export_button.configure(state="normal")
+        self.audio_label.configure(text="Live transcription completed.")
 
     def pause_recording(self):
         """Suspendre temporairement l'enregistrement audio."""
@@ -538,9 +849,9 @@ class DiarizationApp(ctk.CTk):
             self.audio_label.configure(text="Recording is not active.")
             return
 
-        self.is_recording = False
         if self.audio_stream is not None:
             self.audio_stream.stop_stream()  # Met en pause le flux sans le fermer
+        self.is_recording = False
         self.audio_label.configure(text="Recording paused.")
 
     def toggle_pause_resume(self):
@@ -550,46 +861,6 @@ class DiarizationApp(ctk.CTk):
         else:
             self.resume_recording()
 
-    from scipy.signal import butter, filtfilt
-    import soundfile as sf
-
-    def high_pass_filter(audio_path, cutoff_freq, output_path):
-        """
-        Applique un filtre passe-haut à un fichier audio.
-
-        Args:
-            audio_path (str): Chemin du fichier audio d'entrée.
-            cutoff_freq (float): Fréquence de coupure du filtre en Hz.
-            output_path (str): Chemin du fichier audio filtré en sortie.
-
-        Returns:
-            None
-        """
-        try:
-            # Charger l'audio
-            data, samplerate = sf.read(audio_path)
-
-            # Si l'audio est stéréo, convertir en mono
-            if len(data.shape) > 1:
-                data = data.mean(axis=1)  # Moyenne des canaux
-
-            # Normalisation de la fréquence de coupure
-            nyquist = 0.5 * samplerate
-            normalized_cutoff = cutoff_freq / nyquist
-
-            # Créer un filtre Butterworth passe-haut
-            b, a = butter(N=4, Wn=normalized_cutoff, btype='high', analog=False)
-
-            # Appliquer le filtre
-            filtered_data = filtfilt(b, a, data)
-
-            # Sauvegarder l'audio filtré
-            sf.write(output_path, filtered_data, samplerate)
-            print(f"Filtre passe-haut appliqué avec succès. Fichier sauvegardé à : {output_path}")
-
-        except Exception as e:
-            print(f"Erreur lors de l'application du filtre passe-haut : {e}")
-
     def resume_recording(self):
         """Reprendre l'enregistrement audio après une pause."""
         if self.is_recording:
@@ -598,15 +869,11 @@ class DiarizationApp(ctk.CTk):
 
         self.is_recording = True
 
-        # Recréez le flux si nécessaire
-        if self.audio_stream is None or self.audio_stream.is_stopped():
-            self.audio_stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=44100,
-                input=True,
-                frames_per_buffer=1024
-            )
+        # Relancer le flux mis en pause, ou le recréer si nécessaire
+        if self.audio_stream is None:
+            self.audio_stream = self.open_input_stream()
+        elif self.audio_stream.is_stopped():
+            self.audio_stream.start_stream()
 
         self.audio_label.configure(text="Recording started.")
         self.recording_thread = threading.Thread(target=self.record_audio)
@@ -621,22 +888,37 @@ class DiarizationApp(ctk.CTk):
             self.audio_label.configure(text="No recording in progress.")
             return
 
+        # Arrêter le flux avant le thread de traitement : les derniers blocs capturés sont encore traités
+        self.audio_stream.stop_stream()
         self.is_recording = False
         self.start_button.configure(fg_color="#FF0000")
-        self.audio_stream.stop_stream()
         self.audio_stream.close()
         self.audio_stream = None  # Assurez-vous que le flux est réinitialisé
         self.audio.terminate()
 
-        # Sauvegarder l'audio dans un fichier WAV temporaire
-        temp_file = "live_session.wav"
+        # Restituer les derniers échantillons retenus par le rééchantillonneur
+        self.recording_thread.join(timeout=2)
+        self.update_capture_stats()
+        if self.stream_resampler is not None:
+            remaining = self.stream_resampler.flush()
+            if remaining is not None:
+                self.process_captured_block(remaining)
+
+        # Transcrire la fin du flux en arrière-plan pendant la sauvegarde
+        if self.live_transcriber is not None:
+            threading.Thread(target=self.finish_live_transcription, daemon=True).start()
+
+        # Finaliser les fichiers écrits pendant la capture (blocs restants et en-tête)
+        temp_file = LIVE_SESSION_FILE
         try:
-            wf = wave.open(temp_file, 'wb')
-            wf.setnchannels(1)
-            wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-            wf.setframerate(44100)
-            wf.writeframes(b''.join(self.audio_frames))
-            wf.close()
+            self.session_recorder.close()
+            if self.archive_recorder is not None:
+                self.archive_recorder.close()
+            dropped = self.session_recorder.dropped_blocks
+            self.session_recorder = None
+            self.archive_recorder = None
+            if dropped:
+                print(f"{dropped} blocs audio perdus : l'écriture sur disque n'a pas suivi la capture.")
             self.audio_label.configure(text="Recording saved as a temporary file.")
 
             # Proposer de sauvegarder le fichier avec un nom personnalisé
@@ -662,7 +944,6 @@ class DiarizationApp(ctk.CTk):
     def update_progress_bar(self, value):
         """Met à jour la barre de progression avec une valeur entre 0 et 100."""
         self.progress_bar["value"] = value
-        self.update_idletasks()  # Met à jour l'interface utilisateur
     def play_original_audio(self):
         """Démarre la lecture à partir de la position actuelle."""
         if not self.audio_path:
@@ -673,17 +954,14 @@ class DiarizationApp(ctk.CTk):
             if not hasattr(self, 'vlc_player'):
                 self.vlc_player = vlc.MediaPlayer(self.audio_path)
 
-            # Démarrer la lecture
-            self.vlc_player.play()
-
-            # Attendre brièvement pour initialiser
-            time.sleep(0.1)
+            if self.pending_seek is not None:
+                self.after_cancel(self.pending_seek)
+                self.pending_seek = None
 
-            # Positionner à la position actuelle en millisecondes
-            self.vlc_player.set_time(int(self.current_position * 1000))
-
-            # Démarrer la mise à jour du curseur et du temps
-            self.update_audio_progress()
+            # Démarrer la lecture, puis positionner dès que VLC joue (set_time() est ignoré avant) ;
+            # le suivi du curseur et du temps démarre à ce moment-là
+            self.vlc_player.play()
+            self.set_time_when_playing(int(self.current_position * 1000), PLAYBACK_START_TIMEOUT_MS)
 
             minutes = int(self.current_position // 60)
             seconds = int(self.current_position % 60)
@@ -707,6 +985,76 @@ class DiarizationApp(ctk.CTk):
         else:
             self.cuda_status_label.configure(text="CUDA unavailable", text_color="red")
 
+    def show_loaded_models(self):
+        """Affiche les modèles WhisperX en cache et permet de les décharger."""
+        window = ctk.CTkToplevel(self)
+        window.title("Loaded Models")
+        window.geometry("420x300")
+
+        models_listbox = tk.Listbox(window, height=8, selectmode=tk.SINGLE, font=("Arial", 12))
+        models_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def refresh():
+            models_listbox.delete(0, "end")
+            cached = list_cached_models()
+            for name, device, compute_type, size_mb in cached:
+                models_listbox.insert("end", f"{name} ({device}, {compute_type}) ~{size_mb:.0f} MB")
+            if not cached:
+                models_listbox.insert("end", "No model loaded.")
+            return cached
+
+        def unload_selected():
+            selection = models_listbox.curselection()
+            cached = list_cached_models()
+            if not selection or selection[0] >= len(cached):
+                return
+            name, device, compute_type, _ = cached[selection[0]]
+            unload_model(name, device, compute_type)
+            refresh()
+            self.audio_label.configure(text=f"Model {name} unloaded.")
+
+        def unload_all():
+            count = unload_model()
+            refresh()
+            self.audio_label.configure(text=f"{count} model(s) unloaded.")
+
+        buttons_frame = ctk.CTkFrame(window)
+        buttons_frame.pack(fill="x", padx=10, pady=5)
+        ctk.CTkButton(buttons_frame, text="Unload", command=unload_selected).pack(side=tk.LEFT, padx=5, pady=5)
+        ctk.CTkButton(buttons_frame, text="Unload All", command=unload_all).pack(side=tk.LEFT, padx=5, pady=5)
+        ctk.CTkButton(buttons_frame, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=5, pady=5)
+
+        refresh()
+
+    def preload_model(self, model):
+        """Demande le préchargement asynchrone d'un modèle (remplace toute demande en attente)."""
+        with self.preload_lock:
+            self.preload_request = model
+        self.preload_event.set()
+        self.model_status_label.configure(text=f"Loading model {model}...", text_color="orange")
+
+    def preload_worker(self):
+        """Charge en arrière-plan le dernier modèle demandé."""
+        while True:
+            self.preload_event.wait()
+            with self.preload_lock:
+                model = self.preload_request
+                self.preload_event.clear()
+
+            try:
+                get_whisperx_model(model)
+            except Exception as e:
+                self.post_ui_event("model_status", f"Model loading error: {e}", "red")
+                continue
+
+            with self.preload_lock:
+                stale = self.preload_request != model
+            if stale:
+                # Un autre modèle a été choisi pendant le chargement : celui-ci sera évincé en premier
+                deprioritize_model(model)
+            else:
+                self.post_ui_event("model_status", f"Model {model} ready", "green")
+
     def show_model_description(self, model):
         """Display model description based on selection."""
         descriptions = {
@@ -718,6 +1066,7 @@ class DiarizationApp(ctk.CTk):
             "Medical-Whisper": "Medical-Whisper: Specialized model for medical audio transcription."
         }
         self.model_description.configure(text=descriptions.get(model, ""))
+        self.preload_model(model)
 
     def format_duration(self, seconds):
         """Convert duration in seconds to 'XmYs' format."""
@@ -725,16 +1074,82 @@ class DiarizationApp(ctk.CTk):
         remaining_seconds = int(seconds % 60)
         return f"{minutes}m{remaining_seconds}s"
 
+    def speaker_display_name(self, speaker):
+        """Nom affiché d'un locuteur (son étiquette d'origine tant qu'il n'est pas renommé)."""
+        return self.speaker_mapping.get(speaker, speaker)
+
+    def speaker_tag(self, speaker):
+        """Tag des en-têtes d'un locuteur dans la zone de texte."""
+        return f"speaker:{speaker}"
+
+    def set_transcriptions(self, transcriptions):
+        """Remplace les transcriptions, met à jour l'index des locuteurs et réaffiche le texte."""
+        self.transcriptions = transcriptions
+        self.speaker_index = {}
+        for i, segment in enumerate(transcriptions):
+            if isinstance(segment, tuple):
+                self.speaker_index.setdefault(segment[2], []).append(i)
+        self.render_transcriptions()
+        self.populate_speaker_list()
+
+    def render_transcriptions(self):
+        """Affiche toutes les transcriptions dans la zone de texte."""
+        self.transcription_text.delete("1.0", tk.END)
+        self.transcript_index.clear()
+        self.highlighted_segment = None
+        for segment in self.transcriptions:
+            if isinstance(segment, tuple):
+                self.insert_segment(*segment)
+            else:
+                self.transcription_text.insert(tk.END, f"{segment}\n\n")
+
+    def insert_segment(self, start, end, speaker, text):
+        """Ajoute un segment ; le nom du locuteur est inséré avec le tag de ce locuteur.
+
+        Les lignes occupées par le segment sont enregistrées dans l'index temps <-> texte.
+        """
+        first_line = self.text_line(tk.END + "-1c")
+        self.transcription_text.insert(tk.END, f"{self.format_duration(start)} - {self.format_duration(end)}: ")
+        self.transcription_text.insert(tk.END, self.speaker_display_name(speaker),
+                                       ("speaker", self.speaker_tag(speaker)))
+        self.transcription_text.insert(tk.END, f"\n{text}\n")
+        self.transcript_index.add(start, end, first_line, self.text_line(tk.END + "-1c"))
+        self.transcription_text.insert(tk.END, "\n")
+
+    def text_line(self, index):
+        """Numéro de ligne d'un indice de la zone de texte."""
+        return int(self.transcription_text.index(index).split(".")[0])
+
+    def highlight_segment_at(self, seconds):
+        """Surligne le segment couvrant l'instant `seconds` (recherche dichotomique dans l'index)."""
+        segment = self.transcript_index.segment_at_time(seconds)
+        if segment == self.highlighted_segment:
+            return
+        self.transcription_text.tag_remove("current_segment", "1.0", tk.END)
+        self.highlighted_segment = segment
+        if segment is not None:
+            start, end = self.transcript_index.text_range(segment)
+            self.transcription_text.tag_add("current_segment", start, end)
+            self.transcription_text.see(start)
+
+    def on_transcript_click(self, event):
+        """Positionne la lecture au début du segment cliqué (sauf pendant une sélection de texte)."""
+        if self.transcription_text.tag_ranges("sel") or not self.audio_path:
+            return
+        segment = self.transcript_index.segment_at_line(self.text_line(f"@{event.x},{event.y}"))
+        if segment is not None:
+            self.seek_to(self.transcript_index.start_time(segment))
+
     def populate_speaker_list(self):
         """Add speakers to the list."""
         self.speaker_listbox.delete(0, "end")
 
         if not self.diarization_enabled.get():
-            self.speaker_listbox.insert("end", "Speaker 1")
+            self.speaker_order = ["Speaker 1"]
         else:
-            speakers = list(set([self.speaker_mapping.get(spk, spk) for _, _, spk, _ in self.transcriptions]))
-            for speaker in speakers:
-                self.speaker_listbox.insert("end", speaker)
+            self.speaker_order = list(self.speaker_index)
+        for speaker in self.speaker_order:
+            self.speaker_listbox.insert("end", self.speaker_display_name(speaker))
 
     def rename_speaker(self):
         """Rename a speaker."""
@@ -744,39 +1159,34 @@ class DiarizationApp(ctk.CTk):
             return
 
         idx = selection[0]
-        speaker = self.speaker_listbox.get(idx)
+        speaker = self.speaker_order[idx]
+        old_name = self.speaker_display_name(speaker)
         new_name = self.name_entry.get().strip()
 
         if not new_name:
             self.audio_label.configure(text="Rename field is empty.")
             return
 
-        # Mettre à jour le mapping des speakers
+        # Mettre à jour le nom affiché du locuteur (les transcriptions gardent l'étiquette d'origine)
         self.speaker_mapping[speaker] = new_name
-        if speaker in self.speaker_files:
-            self.speaker_files[new_name] = self.speaker_files.pop(speaker)
-
-        # Rafraîchir la liste des speakers
-        self.populate_speaker_list()
-
-        # Effacer et réinsérer les transcriptions avec le format correct
-        self.transcription_text.delete("1.0", tk.END)
 
-        for i, (start, end, spk, text) in enumerate(self.transcriptions):
-            if spk == speaker:
-                self.transcriptions[i] = (start, end, new_name, text)
+        # Remplacer uniquement les en-têtes de ce locuteur, en partant de la fin pour garder les indices valides
+        tag = self.speaker_tag(speaker)
+        ranges = self.transcription_text.tag_ranges(tag)
+        for i in range(len(ranges) - 2, -1, -2):
+            start, end = str(ranges[i]), str(ranges[i + 1])
+            self.transcription_text.delete(start, end)
+            self.transcription_text.insert(start, new_name, ("speaker", tag))
 
-            # Conversion des durées au format minutes:secondes
-            start_formatted = self.format_duration(start)
-            end_formatted = self.format_duration(end)
-            display_name = self.speaker_mapping.get(spk, spk)
-
-            # Réinsertion dans la zone de texte
-            self.transcription_text.insert(tk.END, f"{start_formatted} - {end_formatted}: {display_name}\n{text}\n\n")
+        # Mettre à jour l'entrée de la liste et la piste de la forme d'onde
+        self.speaker_listbox.delete(idx)
+        self.speaker_listbox.insert(idx, new_name)
+        self.speaker_listbox.selection_set(idx)
+        self.waveform_view.set_lane_name(speaker, new_name)
 
         # Réinitialiser le champ d'entrée
         self.name_entry.delete(0, tk.END)
-        self.audio_label.configure(text=f"Speaker {speaker} renamed to {new_name}.")
+        self.audio_label.configure(text=f"Speaker {old_name} renamed to {new_name}.")
 
     def load_audio_file(self):
         """Charge un fichier audio et initialise le lecteur VLC."""
@@ -785,8 +1195,6 @@ class DiarizationApp(ctk.CTk):
             filetypes=(("Audio Files", "*.mp3 *.wav *.ogg *.flac"), ("All Files", "*.*"))
         )
         if self.audio_path:
-            # Sauvegarder une copie de l'original
-            shutil.copy(self.audio_path, "original_audio.wav")
             self.audio_label.configure(text=f"File loaded: {os.path.basename(self.audio_path)}")
             self.vlc_player = vlc.MediaPlayer(self.audio_path)
             self.process_button.configure(state="normal")
@@ -813,8 +1221,12 @@ class DiarizationApp(ctk.CTk):
         if output_file:
             try:
                 with open(output_file, "w", encoding="utf-8") as f:
-                    for start, end, spk, text in self.transcriptions:
-                        f.write(f"{start} - {end}: {spk}\n{text}\n\n")
+                    for segment in self.transcriptions:
+                        if isinstance(segment, tuple):
+                            start, end, spk, text = segment
+                            f.write(f"{start} - {end}: {self.speaker_display_name(spk)}\n{text}\n\n")
+                        else:
+                            f.write(f"{segment}\n\n")
                 self.audio_label.configure(text=f"Results saved to {output_file}")
             except Exception as e:
                 self.audio_label.configure(text=f"Save error: {str(e)}")
@@ -822,46 +1234,105 @@ class DiarizationApp(ctk.CTk):
     def start_processing(self):
         """Start processing the audio."""
         self.process_button.configure(state="disabled")
-        threading.Thread(target=self.process_audio).start()
+        # Options lues ici, dans le thread Tk, puis transmises au thread de travail
+        options = {
+            "diarization_enabled": self.diarization_enabled.get(),
+            "model_name": self.model_choice.get(),
+            "single_pass": self.single_pass_enabled.get(),
+            "preprocess": self.get_preprocessing_options(),
+            "progress_callback": lambda stage, fraction, eta: self.post_ui_event("progress", stage, fraction, eta),
+        }
+        self.update_progress_bar(0)
+        threading.Thread(target=self.process_audio, args=(self.audio_path, options), daemon=True).start()
 
-    def process_audio(self):
-        """Process the audio file."""
+    def process_audio(self, audio_path, options):
+        """Process the audio file (thread de travail : les résultats passent par la file d'événements)."""
         try:
-            selected_model = self.model_choice.get()  # Récupère le modèle sélectionné dans l'interface
-            self.transcriptions, self.speaker_files = process_audio(
-                self.audio_path, self.diarization_enabled.get(), model_name=selected_model
-            )
-
-            self.transcription_text.delete("1.0", tk.END)
-
-            if not self.diarization_enabled.get():
-                for text in self.transcriptions:
-                    self.transcription_text.insert(tk.END, f"{text}\n\n")
-            else:
-                for start, end, spk, text in self.transcriptions:
-                    start_formatted = self.format_duration(start)
-                    end_formatted = self.format_duration(end)
-                    self.transcription_text.insert(tk.END, f"{start_formatted} - {end_formatted}: {spk}\n{text}\n\n")
-
-            # Réinitialiser le lecteur VLC
-            if hasattr(self, 'vlc_player'):
-                self.vlc_player.stop()  # Arrêter la lecture si en cours
-                self.vlc_player = vlc.MediaPlayer(self.audio_path)  # Recharger le fichier audio
-
-            # Réinitialiser le curseur et l'état
-            self.current_position = 0
-            self.audio_slider.set(0)
-            self.audio_slider_label.configure(text="0m0s")
-            self.audio_label.configure(text="Audio processed and ready.")
-            self.populate_speaker_list()
-            self.export_button.configure(state="normal")
+            transcriptions, speaker_files = process_audio(audio_path, **options)
+            if transcriptions is None:
+                self.post_ui_event("status", "Error: audio processing failed.")
+                return
+            self.post_ui_event("processing_result", audio_path, transcriptions, speaker_files)
+            self.load_waveform(audio_path, speaker_files)
         except Exception as e:
-            self.audio_label.configure(text=f"Error: {str(e)}")
+            self.post_ui_event("status", f"Error: {str(e)}")
         finally:
-            self.process_button.configure(state="normal")
+            self.post_ui_event("processing_finished")
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
 
+    def apply_processing_result(self, audio_path, transcriptions, speaker_files):
+        """Affiche le résultat du traitement et réinitialise la lecture."""
+        with self.preview_lock:
+            self.speaker_files = speaker_files
+            self.speaker_previews = {}
+            self.processed_audio_path = audio_path
+        self.speaker_mapping = {}
+        self.set_transcriptions(transcriptions)
+
+        # Réinitialiser le lecteur VLC
+        if hasattr(self, 'vlc_player'):
+            self.vlc_player.stop()  # Arrêter la lecture si en cours
+            self.vlc_player = vlc.MediaPlayer(audio_path)  # Recharger le fichier audio
+
+        # Réinitialiser le curseur et l'état
+        self.current_position = 0
+        self.audio_slider.set(0)
+        self.audio_slider_label.configure(text="0m0s")
+        self.audio_label.configure(text="Audio processed and ready.")
+        self.export_button.configure(state="normal")
+
+    def apply_processing_finished(self):
+        """Réactive le bouton de traitement à la fin du thread de travail."""
+        self.process_button.configure(state="normal")
+
+    def post_ui_event(self, kind, *args):
+        """Envoie un événement à l'interface ; utilisable depuis n'importe quel thread."""
+        self.ui_events.put((kind, args))
+
+    def pump_ui_events(self):
+        """Applique par lots, dans le thread Tk, les événements envoyés par les threads de travail.
+
+        Les segments en direct reçus depuis le dernier passage sont insérés en une fois, et seul
+        le dernier événement d'état de chaque type est appliqué.
+        """
+        events = []
+        try:
+            while True:
+                events.append(self.ui_events.get_nowait())
+        except queue.Empty:
+            pass
+
+        if events:
+            last_index = {kind: i for i, (kind, _) in enumerate(events)}
+            live_segments = [args for kind, args in events if kind == "live_segment"]
+            if live_segments:
+                self.apply_live_segments(live_segments)
+            for i, (kind, args) in enumerate(events):
+                if kind == "live_segment" or (kind in COALESCED_UI_EVENTS and last_index[kind] != i):
+                    continue
+                try:
+                    self.ui_handlers[kind](*args)
+                except Exception as e:
+                    print(f"Erreur lors de la mise à jour de l'interface ({kind}) : {e}")
+
+        self.after(UI_PUMP_INTERVAL_MS, self.pump_ui_events)
+
+    def apply_status(self, text):
+        """Affiche un message d'état."""
+        self.audio_label.configure(text=text)
+
+    def apply_progress(self, stage, fraction, eta):
+        """Affiche l'avancement du traitement et le temps restant estimé."""
+        self.update_progress_bar(fraction * 100)
+        self.audio_label.configure(
+            text=f"{STAGE_LABELS.get(stage, stage)}... {fraction:.0%} (remaining ~{format_eta(eta)})"
+        )
+
+    def apply_model_status(self, text, color):
+        """Affiche l'état du chargement du modèle."""
+        self.model_status_label.configure(text=text, text_color=color)
+
 if __name__ == "__main__":
     app = DiarizationApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import queue
+import threading
+import numpy as np
+from math import gcd
+from scipy.signal import resample_poly
+from audio_processing import get_whisperx_model, SAMPLE_RATE, LANGUAGE
+
+
+class LiveTranscriber:
+    """Transcription incrémentale d'un flux audio en direct.
+
+    Les blocs PCM 16 bits reçus du micro sont accumulés dans un tampon préalloué. Un détecteur
+    d'activité vocale (énergie par trame) découpe le flux à la fin de chaque prise de parole,
+    ou quand le tampon est plein, et chaque morceau est transcrit dans un thread dédié avec le
+    modèle WhisperX en cache.
+    """
+
+    def __init__(self, model_name="small", input_rate=44100, on_segment=None, max_chunk_seconds=20,
+                 silence_seconds=0.6, energy_threshold=0.01, frame_seconds=0.03, batch_size=16):
+        """
+        Args:
+            model_name (str): Nom du modèle Whisper à utiliser.
+            input_rate (int): Fréquence d'échantillonnage du flux d'entrée.
+            on_segment (callable, optional): Appelée avec (start, end, texte) pour chaque segment transcrit,
+                depuis le thread de transcription.
+            max_chunk_seconds (float): Durée maximale d'un morceau envoyé au modèle.
+            silence_seconds (float): Durée de silence qui termine une prise de parole.
+            energy_threshold (float): Seuil RMS (audio normalisé entre -1 et 1) d'une trame de parole.
+            frame_seconds (float): Durée des trames d'analyse du détecteur d'activité vocale.
+        """
+        self.model_name = model_name
+        self.input_rate = input_rate
+        self.on_segment = on_segment
+        self.silence_frames = int(silence_seconds / frame_seconds)
+        self.energy_threshold = energy_threshold
+        self.frame_size = int(frame_seconds * input_rate)
+        self.batch_size = batch_size
+
+        factor = gcd(SAMPLE_RATE, input_rate)
+        self.up, self.down = SAMPLE_RATE // factor, input_rate // factor
+
+        # Tampon préalloué, réutilisé d'un morceau à l'autre
+        self.buffer = np.zeros(int(max_chunk_seconds * input_rate), dtype=np.float32)
+        self.length = 0            # Échantillons valides dans le tampon
+        self.analyzed = 0          # Échantillons déjà passés au détecteur
+        self.has_speech = False
+        self.silent_frames = 0
+        self.stream_position = 0   # Position (échantillons) du début du tampon dans le flux
+
+        self.segments = []  # (start, end, texte) transcrits, dans l'ordre
+        self.chunks = queue.Queue()
+        self.worker = threading.Thread(target=self._transcribe_worker, daemon=True)
+        self.worker.start()
+
+    def feed(self, data):
+        """Ajoute un bloc PCM 16 bits mono (bytes) au flux."""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        while len(samples):
+            count = min(len(samples), len(self.buffer) - self.length)
+            self.buffer[self.length:self.length + count] = samples[:count]
+            self.length += count
+            samples = samples[count:]
+            self._detect_voice_activity()
+            if self.length == len(self.buffer):
+                self._emit_chunk()
+
+    def _detect_voice_activity(self):
+        """Analyse les trames complètes reçues et émet un morceau après une prise de parole suivie d'un silence."""
+        while self.analyzed + self.frame_size <= self.length:
+            frame = self.buffer[self.analyzed:self.analyzed + self.frame_size]
+            self.analyzed += self.frame_size
+            if np.sqrt(np.mean(frame * frame)) >= self.energy_threshold:
+                self.has_speech = True
+                self.silent_frames = 0
+            else:
+                self.silent_frames += 1
+                if self.silent_frames >= self.silence_frames:
+                    # Fin de prise de parole : transcrire ; silence seul : l'écarter sans le transcrire
+                    self._emit_chunk(self.analyzed)
+
+    def _discard(self, end):
+        """Retire les `end` premiers échantillons du tampon."""
+        remaining = self.length - end
+        self.buffer[:remaining] = self.buffer[end:self.length]
+        self.length = remaining
+        self.analyzed = max(self.analyzed - end, 0)
+        self.stream_position += end
+        self.silent_frames = 0
+
+    def _emit_chunk(self, end=None):
+        """Envoie les `end` premiers échantillons (tout le tampon par défaut) au thread de transcription."""
+        end = self.length if end is None else end
+        if end > 0 and self.has_speech:
+            start_time = self.stream_position / self.input_rate
+            self.chunks.put((start_time, self.buffer[:end].copy()))
+        self.has_speech = False
+        self._discard(end)
+
+    def _transcribe_worker(self):
+        """Transcrit les morceaux dans l'ordre d'arrivée."""
+        while True:
+            item = self.chunks.get()
+            if item is None:
+                self.chunks.task_done()
+                return
+            start_time, chunk = item
+            try:
+                audio = resample_poly(chunk, self.up, self.down).astype(np.float32)
+                model = get_whisperx_model(self.model_name)
+                result = model.transcribe(audio, batch_size=self.batch_size, language=LANGUAGE)
+                for segment in result["segments"]:
+                    text = segment["text"].strip()
+                    if not text:
+                        continue
+                    entry = (start_time + segment["start"], start_time + segment["end"], text)
+                    self.segments.append(entry)
+                    if self.on_segment is not None:
+                        self.on_segment(*entry)
+            except Exception as e:
+                print(f"Erreur pendant la transcription en direct : {e}")
+            finally:
+                self.chunks.task_done()
+
+    def finish(self):
+        """Transcrit le reste du tampon, attend la fin du thread et retourne tous les segments."""
+        self._emit_chunk()
+        self.chunks.put(None)
+        self.worker.join()
+        return list(self.segments)
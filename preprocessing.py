@@ -0,0 +1,347 @@
+import numpy as np
+import soundfile as sf
+from math import gcd
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt, get_window, resample_poly
+
+
+# Nombre d'échantillons lus par bloc pour le traitement en flux
+BLOCK_SIZE = 65536
+
+# Niveau RMS cible (dBFS) de la normalisation en mode 'loudness'
+LOUDNESS_TARGET_DB = -20.0
+
+
+def _to_mono(block):
+    """Moyenne des canaux d'un bloc (frames, canaux) ; un bloc mono est retourné tel quel."""
+    return block.mean(axis=1) if block.ndim > 1 else block
+
+
+def normalization_gain(peak, rms, mode="peak", target_db=0.0):
+    """Gain linéaire pour amener le pic (mode 'peak') ou le RMS (mode 'loudness') à `target_db` dBFS.
+
+    En mode 'loudness', le gain est limité pour que le pic ne dépasse pas 0 dBFS.
+    """
+    target = 10 ** (target_db / 20)
+    if mode == "peak":
+        return target / peak if peak > 0 else 1.0
+    if mode == "loudness":
+        if rms <= 0:
+            return 1.0
+        return min(target / rms, 1.0 / peak)
+    raise ValueError(f"Mode de normalisation inconnu : {mode}")
+
+
+class BlockProcessor:
+    """Étape de traitement audio en flux : reçoit des blocs successifs et retourne des blocs traités.
+
+    Les étapes se chaînent dans un `AudioPipeline`. Une étape qui garde des échantillons en attente
+    (rééchantillonnage) les restitue dans `flush()` en fin de flux.
+    """
+
+    def process(self, block):
+        return block
+
+    def flush(self):
+        """Retourne les échantillons encore en attente en fin de flux (None si aucun)."""
+        return None
+
+    def finalize(self, audio):
+        """Ajuste en place le signal complet produit par le pipeline (gain global par exemple)."""
+        return audio
+
+
+class Downmix(BlockProcessor):
+    """Ramène les blocs (frames, canaux) en mono par moyenne des canaux."""
+
+    def process(self, block):
+        return _to_mono(block)
+
+
+class Resample(BlockProcessor):
+    """Rééchantillonnage polyphase en flux, identique à `resample_poly` sur le signal entier.
+
+    Chaque bloc est rééchantillonné avec le contexte d'entrée nécessaire au filtre ; seules les
+    sorties dont tout le contexte est disponible sont produites, les autres attendent le bloc suivant.
+    """
+
+    def __init__(self, input_rate, output_rate):
+        factor = gcd(int(input_rate), int(output_rate))
+        self.up, self.down = int(output_rate) // factor, int(input_rate) // factor
+        # Demi-longueur du filtre de resample_poly (10 * max(up, down)), en échantillons d'entrée
+        self.context = -(-10 * max(self.up, self.down) // self.up) + 1
+        self.buffer = None
+        self.start = 0      # Indice global (multiple de `down`) du premier échantillon du tampon
+        self.position = 0   # Indice global de la prochaine sortie
+        self.total = 0      # Nombre d'échantillons d'entrée reçus
+
+    def _outputs(self, end):
+        """Sorties globales [position, end) calculées sur le tampon courant."""
+        if end <= self.position:
+            return self.buffer[:0]
+        resampled = resample_poly(self.buffer, self.up, self.down, axis=0)
+        offset = self.start * self.up // self.down
+        outputs = resampled[self.position - offset:end - offset]
+        self.position = end
+        return outputs.astype(self.buffer.dtype, copy=False)
+
+    def process(self, block):
+        if self.up == self.down:
+            return block
+        self.buffer = block if self.buffer is None else np.concatenate([self.buffer, block])
+        self.total += len(block)
+
+        # Sorties dont tout le contexte d'entrée (à droite) est disponible
+        available = self.total - 1 - self.context
+        outputs = self._outputs(available * self.up // self.down + 1 if available >= 0 else 0)
+
+        # Oublier l'entrée qui ne sert plus (en gardant un début de tampon multiple de `down`)
+        needed = self.position * self.down // self.up - self.context - 1
+        new_start = max(self.start, (needed // self.down) * self.down)
+        self.buffer = self.buffer[new_start - self.start:]
+        self.start = new_start
+        return outputs
+
+    def flush(self):
+        if self.up == self.down or self.buffer is None:
+            return None
+        return self._outputs(-(-self.total * self.up // self.down))
+
+
+class Normalize(BlockProcessor):
+    """Normalisation globale : mesure le pic (et le RMS) au fil des blocs et applique le gain au signal final.
+
+    Mode 'peak' : pic amené à `target_db` dBFS (0 par défaut). Mode 'loudness' : RMS amené à
+    `target_db` (`LOUDNESS_TARGET_DB` par défaut), gain limité pour que le pic ne dépasse pas 0 dBFS.
+    """
+
+    def __init__(self, mode="peak", target_db=None):
+        if target_db is None:
+            target_db = LOUDNESS_TARGET_DB if mode == "loudness" else 0.0
+        normalization_gain(1.0, 1.0, mode=mode)  # Valide le mode dès la construction
+        self.mode = mode
+        self.target_db = target_db
+        self.peak = 0.0
+        self.sum_squares = 0.0
+        self.count = 0
+
+    def process(self, block):
+        if len(block):
+            self.peak = max(self.peak, float(np.max(np.abs(block))))
+            self.sum_squares += float(np.dot(block.ravel(), block.ravel()))
+            self.count += block.size
+        return block
+
+    def finalize(self, audio):
+        rms = np.sqrt(self.sum_squares / self.count) if self.count else 0.0
+        gain = normalization_gain(self.peak, rms, mode=self.mode, target_db=self.target_db)
+        audio *= np.asarray(gain, audio.dtype)
+        return audio
+
+
+class HighPassFilter(BlockProcessor):
+    """Filtre passe-haut Butterworth en sections du second ordre, avec état conservé entre blocs.
+
+    Les blocs successifs d'un même flux (fichier lu par blocs ou enregistrement en direct) sont
+    filtrés comme un signal continu. Les blocs multicanaux (frames, canaux) sont filtrés en une
+    seule opération vectorisée.
+    """
+
+    def __init__(self, samplerate, cutoff_freq=80.0, order=4):
+        self.sos = butter(order, cutoff_freq, btype="highpass", fs=samplerate, output="sos")
+        self.zi = None
+
+    def process(self, block):
+        """Filtre un bloc (frames,) ou (frames, canaux) et retourne le bloc filtré (float)."""
+        block = np.asarray(block, dtype=np.float64 if block.dtype == np.float64 else np.float32)
+        if len(block) == 0:
+            return block
+        if self.zi is None:
+            # État initial en régime permanent pour le premier échantillon (pas de transitoire de démarrage)
+            zi = sosfilt_zi(self.sos)
+            self.zi = zi[:, :, None] * block[0] if block.ndim > 1 else zi * block[0]
+        filtered, self.zi = sosfilt(self.sos, block, axis=0, zi=self.zi)
+        return filtered.astype(block.dtype, copy=False)
+
+    def reset(self):
+        """Réinitialise l'état (début d'un nouveau flux)."""
+        self.zi = None
+
+
+class ZeroPhaseHighPass(BlockProcessor):
+    """Filtre passe-haut Butterworth aller-retour (sans déphasage), en flux par addition-recouvrement.
+
+    Le flux est découpé en trames de `2 * hop` échantillons pondérées par une fenêtre de Hann
+    (somme constante à 50 % de recouvrement). Chaque trame, complétée par une marge de zéros de
+    chaque côté pour contenir la réponse du filtre, est filtrée aller-retour (`sosfiltfilt`),
+    puis les trames filtrées sont additionnées. Le filtre étant linéaire, le résultat approche
+    le filtrage aller-retour du signal entier sans jamais le charger en mémoire.
+
+    Les sorties sont en retard d'environ une trame sur les entrées ; `flush()` restitue la fin du
+    flux, de sorte que la longueur totale produite est celle de l'entrée.
+    """
+
+    def __init__(self, samplerate, cutoff_freq=80.0, order=4, hop=BLOCK_SIZE // 2):
+        self.sos = butter(order, cutoff_freq, btype="highpass", fs=samplerate, output="sos")
+        self.hop = hop
+        # Marge couvrant la décroissance de la réponse impulsionnelle (10 périodes de la coupure)
+        self.margin = int(np.ceil(10 * samplerate / cutoff_freq))
+        self.window = get_window("hann", 2 * hop, fftbins=True)[:, None]
+        self.inbuf = None           # Entrée en attente ; coordonnées décalées de `hop` (zéros ajoutés au début)
+        self.in_start = 0
+        self.acc = None             # Accumulateur de sortie couvrant [acc_start, acc_start + len(acc))
+        self.acc_start = -self.margin
+        self.frame = 0              # Début de la prochaine trame
+        self.emitted = hop          # Prochain échantillon à produire (échantillon réel 0 = position `hop`)
+        self.total = 0
+        self.mono = True            # Blocs (frames,) en entrée : sorties au même format
+        self.dtype = np.float32
+
+    def _process_frame(self):
+        hop, margin = self.hop, self.margin
+        segment = self.inbuf[self.frame - self.in_start:self.frame - self.in_start + 2 * hop] * self.window
+        padding = np.zeros((margin, segment.shape[1]))
+        filtered = sosfiltfilt(self.sos, np.vstack([padding, segment, padding]), axis=0, padtype=None)
+
+        end = self.frame + 2 * hop + margin
+        if self.acc_start + len(self.acc) < end:
+            self.acc = np.vstack([self.acc, np.zeros((end - self.acc_start - len(self.acc), self.acc.shape[1]))])
+        self.acc[self.frame - margin - self.acc_start:end - self.acc_start] += filtered
+        self.frame += hop
+
+    def _emit(self, final):
+        """Retire de l'accumulateur les sorties définitives jusqu'à `final` (exclu)."""
+        output = self.acc[self.emitted - self.acc_start:final - self.acc_start]
+        self.acc = self.acc[final - self.acc_start:]
+        self.acc_start = self.emitted = final
+        return output
+
+    def _format(self, outputs):
+        output = np.vstack(outputs) if outputs else np.zeros((0, self.inbuf.shape[1]))
+        output = output.astype(self.dtype, copy=False)
+        return output[:, 0] if self.mono else output
+
+    def process(self, block):
+        self.dtype = np.float64 if block.dtype == np.float64 else np.float32
+        self.mono = block.ndim == 1
+        block = np.asarray(block, dtype=np.float64)
+        if self.mono:
+            block = block[:, None]
+        if self.inbuf is None:
+            self.inbuf = np.zeros((self.hop, block.shape[1]))
+            self.acc = np.zeros((0, block.shape[1]))
+        self.inbuf = np.vstack([self.inbuf, block])
+        self.total += len(block)
+
+        outputs = []
+        while self.in_start + len(self.inbuf) >= self.frame + 2 * self.hop:
+            self._process_frame()
+            # Les échantillons avant `frame - margin` ne recevront plus de contribution
+            final = self.frame - self.margin
+            if final > self.emitted:
+                outputs.append(self._emit(final))
+            self.inbuf = self.inbuf[self.frame - self.in_start:]
+            self.in_start = self.frame
+        return self._format(outputs)
+
+    def flush(self):
+        if self.inbuf is None:
+            return None
+        # Fin du flux : compléter par des zéros et traiter les trames couvrant les derniers échantillons
+        end = self.hop + self.total
+        while self.frame < end:
+            missing = self.frame + 2 * self.hop - (self.in_start + len(self.inbuf))
+            if missing > 0:
+                self.inbuf = np.vstack([self.inbuf, np.zeros((missing, self.inbuf.shape[1]))])
+            self._process_frame()
+        return self._format([self._emit(end)] if end > self.emitted else [])
+
+
+class AudioPipeline:
+    """Chaîne d'étapes `BlockProcessor` appliquées en un seul passage sur un flux audio.
+
+    Exemple : `AudioPipeline([Downmix(), Resample(44100, 16000), HighPassFilter(16000), Normalize()])`
+    lit le fichier une fois par blocs et produit directement le tampon d'entrée de l'ASR et de la
+    diarisation, sans fichier intermédiaire.
+    """
+
+    def __init__(self, processors):
+        self.processors = list(processors)
+
+    def process(self, block):
+        """Fait passer un bloc dans toutes les étapes."""
+        for processor in self.processors:
+            block = processor.process(block)
+        return block
+
+    def flush(self):
+        """Vide les étapes en fin de flux ; les restes de chaque étape traversent les étapes suivantes."""
+        blocks = []
+        for index, processor in enumerate(self.processors):
+            remaining = processor.flush()
+            if remaining is None or len(remaining) == 0:
+                continue
+            for following in self.processors[index + 1:]:
+                remaining = following.process(remaining)
+            blocks.append(remaining)
+        return blocks
+
+    def run(self, blocks, expected_length=0):
+        """Traite un itérable de blocs et retourne le signal complet (tampon préalloué, agrandi si besoin)."""
+        output = None
+        length = 0
+
+        def append(block):
+            nonlocal output, length
+            if len(block) == 0:
+                return
+            if output is None:
+                output = np.empty((max(expected_length, len(block)),) + block.shape[1:], dtype=np.float32)
+            elif length + len(block) > len(output):
+                output = np.resize(output, (max(2 * len(output), length + len(block)),) + output.shape[1:])
+            output[length:length + len(block)] = block
+            length += len(block)
+
+        for block in blocks:
+            append(self.process(block))
+        for block in self.flush():
+            append(block)
+
+        audio = output[:length] if output is not None else np.zeros(0, dtype=np.float32)
+        for processor in self.processors:
+            audio = processor.finalize(audio)
+        return audio
+
+    def run_file(self, audio_path, blocksize=BLOCK_SIZE, output_rate=None):
+        """Lit un fichier par blocs et retourne le signal traité."""
+        info = sf.info(audio_path)
+        expected = int(info.frames * output_rate / info.samplerate) + 1 if output_rate else info.frames
+        blocks = sf.blocks(audio_path, blocksize=blocksize, dtype="float32", always_2d=True)
+        return self.run(blocks, expected_length=expected)
+
+
+def build_preprocessing_pipeline(input_rate, output_rate=16000, high_pass=False, normalize=False,
+                                 zero_phase=False, cutoff_freq=80.0):
+    """Construit le pipeline de prétraitement : mono, rééchantillonnage, passe-haut, normalisation.
+
+    Args:
+        high_pass (bool): Filtre passe-haut à `cutoff_freq` Hz.
+        normalize (bool | str): Normalisation 'peak' ou 'loudness' (True équivaut à 'peak').
+        zero_phase (bool): Passe-haut aller-retour sans déphasage (`ZeroPhaseHighPass`) au lieu
+            du filtre causal.
+    """
+    processors = [Downmix(), Resample(input_rate, output_rate)]
+    if high_pass:
+        processors.append(ZeroPhaseHighPass(output_rate, cutoff_freq) if zero_phase
+                          else HighPassFilter(output_rate, cutoff_freq))
+    if normalize:
+        processors.append(Normalize("peak" if normalize is True else normalize))
+    return AudioPipeline(processors)
+
+
+def preprocess_audio_file(audio_path, output_rate=16000, high_pass=False, normalize=False, zero_phase=False,
+                          blocksize=BLOCK_SIZE):
+    """Décode et prétraite un fichier en un seul passage par blocs (float32 mono à `output_rate`)."""
+    info = sf.info(audio_path)
+    pipeline = build_preprocessing_pipeline(info.samplerate, output_rate, high_pass=high_pass, normalize=normalize,
+                                            zero_phase=zero_phase)
+    return pipeline.run_file(audio_path, blocksize=blocksize, output_rate=output_rate)
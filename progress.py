@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+
+
+# Facteurs temps réel (durée de traitement / durée audio) mesurés sur cette machine, par profil et par étape
+RTF_STATS_PATH = os.path.join("cache", "rtf_stats.json")
+
+# Facteurs supposés tant qu'aucune mesure n'existe pour un profil
+DEFAULT_STAGE_RTF = {
+    "decode": 0.005,
+    "diarization": 0.05,
+    "transcription": 0.2,
+    "export": 0.001,
+}
+
+# Poids d'une nouvelle mesure dans la moyenne glissante
+RTF_SMOOTHING = 0.3
+
+_stats_lock = threading.Lock()
+
+
+def load_rtf_stats():
+    """Charge les facteurs temps réel mesurés ({profil: {étape: rtf}})."""
+    try:
+        with open(RTF_STATS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_rtf(profile, measured):
+    """Intègre les facteurs temps réel mesurés pour un profil dans les statistiques sur disque."""
+    with _stats_lock:
+        stats = load_rtf_stats()
+        stages = stats.setdefault(profile, {})
+        for stage, rtf in measured.items():
+            previous = stages.get(stage)
+            stages[stage] = rtf if previous is None else (1 - RTF_SMOOTHING) * previous + RTF_SMOOTHING * rtf
+        try:
+            os.makedirs(os.path.dirname(RTF_STATS_PATH), exist_ok=True)
+            temp_path = f"{RTF_STATS_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(stats, f, indent=2)
+            os.replace(temp_path, RTF_STATS_PATH)  # Écriture atomique
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement des mesures de vitesse : {e}")
+
+
+def format_eta(seconds):
+    """Convertit une durée restante en texte court ('1h05m', '3m20s', '12s')."""
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+class ProgressTracker:
+    """Avancement global d'un traitement découpé en étapes, avec estimation du temps restant.
+
+    La durée attendue de chaque étape vient du facteur temps réel mesuré sur cette machine pour
+    le même profil (modèle, appareil, options) lors des traitements précédents. Pendant une étape,
+    la vitesse observée remplace l'estimation. Les durées réelles sont enregistrées à la fin.
+    """
+
+    def __init__(self, stages, audio_duration, profile, callback=None):
+        """
+        Args:
+            stages (list): Étapes dans l'ordre d'exécution.
+            audio_duration (float): Durée de l'audio traité (secondes).
+            profile (str): Profil de vitesse (par exemple modèle, appareil et options).
+            callback (callable, optional): Appelée avec (étape, avancement global entre 0 et 1,
+                temps restant estimé en secondes).
+        """
+        self.stages = list(stages)
+        self.audio_duration = max(audio_duration, 1e-3)
+        self.profile = profile
+        self.callback = callback
+
+        rtf = dict(DEFAULT_STAGE_RTF)
+        rtf.update(load_rtf_stats().get(profile, {}))
+        self.expected = {stage: rtf.get(stage, 0.01) * self.audio_duration for stage in self.stages}
+
+        self.current = None
+        self.stage_start = None
+        self.elapsed = {}  # Durée réelle des étapes terminées
+
+    def update(self, stage, fraction):
+        """Signale l'avancement (entre 0 et 1) de l'étape `stage`."""
+        now = time.perf_counter()
+        if stage != self.current:
+            if self.current is not None:
+                self.elapsed[self.current] = now - self.stage_start
+            self.current = stage
+            self.stage_start = now
+        fraction = min(max(fraction, 0.0), 1.0)
+
+        # Temps restant de l'étape en cours : vitesse observée dès qu'elle est mesurable
+        stage_elapsed = now - self.stage_start
+        if fraction > 0.05 and stage_elapsed > 0.5:
+            remaining = stage_elapsed / fraction * (1 - fraction)
+        else:
+            remaining = self.expected.get(stage, 0.0) * (1 - fraction)
+        later = self.stages[self.stages.index(stage) + 1:] if stage in self.stages else []
+        eta = remaining + sum(self.expected[s] for s in later)
+
+        # Avancement global pondéré par les durées attendues
+        total = sum(self.expected.values()) or 1.0
+        done = sum(self.expected[s] for s in self.stages if s in self.elapsed and s != stage)
+        overall = (done + self.expected.get(stage, 0.0) * fraction) / total
+
+        if self.callback is not None:
+            self.callback(stage, min(overall, 1.0), eta)
+
+    def finish(self):
+        """Termine le suivi et enregistre les facteurs temps réel mesurés."""
+        if self.current is not None:
+            self.elapsed[self.current] = time.perf_counter() - self.stage_start
+            self.current = None
+        if self.elapsed:
+            record_rtf(self.profile, {stage: elapsed / self.audio_duration for stage, elapsed in self.elapsed.items()})
+        if self.callback is not None:
+            self.callback("done", 1.0, 0.0)
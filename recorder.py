@@ -0,0 +1,180 @@
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+import soundfile as sf
+
+
+class StreamingRecorder:
+    """Écrit un enregistrement PCM 16 bits sur disque au fil de la capture, à mémoire constante.
+
+    Les blocs capturés passent par une file bornée vers un thread d'écriture. Le fichier (WAV ou
+    FLAC selon l'extension) grandit pendant l'enregistrement ; l'en-tête WAV est mis à jour
+    régulièrement et à la fermeture, si bien qu'un arrêt brutal de l'application ne perd que les
+    dernières secondes.
+    """
+
+    def __init__(self, path, samplerate, channels=1, max_queued_blocks=512, sync_interval=2.0):
+        """
+        Args:
+            path (str): Fichier de sortie (.wav ou .flac).
+            samplerate (int): Fréquence d'échantillonnage.
+            channels (int): Nombre de canaux.
+            max_queued_blocks (int): Taille de la file entre la capture et l'écriture.
+            sync_interval (float): Intervalle (secondes) de mise à jour de l'en-tête et de synchronisation disque.
+        """
+        self.path = path
+        self.samplerate = samplerate
+        self.channels = channels
+        self.sync_interval = sync_interval
+        self.is_flac = path.lower().endswith(".flac")
+
+        self.frames_written = 0
+        self.dropped_blocks = 0
+        self.queue = queue.Queue(maxsize=max_queued_blocks)
+
+        if self.is_flac:
+            self.file = sf.SoundFile(path, "w", samplerate=samplerate, channels=channels, format="FLAC",
+                                     subtype="PCM_16")
+        else:
+            self.file = open(path, "wb")
+            self._write_wav_header()
+
+        self.writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self.writer_thread.start()
+
+    def _write_wav_header(self):
+        """Écrit (ou réécrit) l'en-tête WAV avec la taille actuelle des données."""
+        data_size = self.frames_written * self.channels * 2
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + data_size, b"WAVE",
+            b"fmt ", 16, 1, self.channels, self.samplerate,
+            self.samplerate * self.channels * 2, self.channels * 2, 16,
+            b"data", data_size
+        )
+        position = self.file.tell()
+        self.file.seek(0)
+        self.file.write(header)
+        if position > len(header):
+            self.file.seek(position)
+
+    def write(self, data):
+        """Ajoute un bloc PCM 16 bits (bytes) ; retourne False si la file est pleine et le bloc perdu."""
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except queue.Full:
+            self.dropped_blocks += 1
+            return False
+
+    def queued_blocks(self):
+        """Nombre de blocs en attente d'écriture."""
+        return self.queue.qsize()
+
+    def _sync(self):
+        """Met à jour l'en-tête et force l'écriture sur disque."""
+        if self.is_flac:
+            self.file.flush()
+            return
+        self._write_wav_header()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _writer(self):
+        """Écrit les blocs de la file sur disque."""
+        last_sync = time.monotonic()
+        while True:
+            try:
+                data = self.queue.get(timeout=self.sync_interval)
+            except queue.Empty:
+                data = b""
+            if data is None:
+                return
+
+            if data:
+                if self.is_flac:
+                    self.file.write(np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels))
+                else:
+                    self.file.write(data)
+                self.frames_written += len(data) // (2 * self.channels)
+
+            if time.monotonic() - last_sync >= self.sync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+
+    def close(self):
+        """Écrit les blocs restants, finalise l'en-tête et ferme le fichier."""
+        self.queue.put(None)
+        self.writer_thread.join()
+        if not self.is_flac:
+            self._write_wav_header()
+        self.file.close()
+
+    @property
+    def duration(self):
+        """Durée écrite sur disque (secondes)."""
+        return self.frames_written / self.samplerate
+
+
+class BlockRingBuffer:
+    """File circulaire préallouée de blocs PCM 16 bits entre le callback de capture et le traitement.
+
+    Un seul producteur (callback PortAudio) et un seul consommateur : chacun ne modifie que son propre
+    compteur, si bien qu'aucun verrou n'est pris dans le callback. Quand la file est pleine, le bloc
+    est écarté et compté au lieu de bloquer la capture.
+    """
+
+    def __init__(self, capacity=256, block_frames=1024):
+        """
+        Args:
+            capacity (int): Nombre de blocs pouvant être en attente.
+            block_frames (int): Nombre maximal d'échantillons par bloc.
+        """
+        self.capacity = capacity
+        self.block_frames = block_frames
+        self.slots = np.zeros((capacity, block_frames), dtype=np.int16)
+        self.lengths = np.zeros(capacity, dtype=np.int64)
+        self.written = 0   # Blocs écrits (modifié uniquement par le producteur)
+        self.read = 0      # Blocs lus (modifié uniquement par le consommateur)
+        self.data_ready = threading.Event()
+
+        # Compteurs de diagnostic
+        self.overruns = 0        # Débordements signalés par PortAudio
+        self.dropped_frames = 0  # Échantillons écartés faute de place dans la file
+        self.max_depth = 0
+
+    def put(self, data):
+        """Copie un bloc PCM 16 bits (bytes) dans la file ; appelé depuis le callback de capture."""
+        samples = np.frombuffer(data, dtype=np.int16)
+        for start in range(0, len(samples), self.block_frames):
+            block = samples[start:start + self.block_frames]
+            depth = self.written - self.read
+            if depth >= self.capacity:
+                self.dropped_frames += len(samples) - start
+                break
+            slot = self.written % self.capacity
+            self.slots[slot, :len(block)] = block
+            self.lengths[slot] = len(block)
+            self.written += 1
+            self.max_depth = max(self.max_depth, depth + 1)
+        self.data_ready.set()
+
+    def get(self, timeout=0.1):
+        """Retourne le bloc suivant (int16), ou None si aucun bloc n'arrive avant `timeout` secondes."""
+        while self.written == self.read:
+            self.data_ready.clear()
+            if self.written != self.read:
+                break
+            if not self.data_ready.wait(timeout):
+                return None
+        slot = self.read % self.capacity
+        block = self.slots[slot, :self.lengths[slot]].copy()
+        self.read += 1
+        return block
+
+    def depth(self):
+        """Nombre de blocs en attente."""
+        return self.written - self.read
@@ -0,0 +1,69 @@
+from bisect import bisect_right
+
+
+class TranscriptIndex:
+    """Correspondance entre les intervalles de temps des segments et leurs lignes dans la zone de texte.
+
+    Les segments sont ajoutés dans l'ordre d'affichage. Les recherches (instant -> segment,
+    ligne -> segment) se font par dichotomie sur des listes triées : O(log n) par requête, quel que
+    soit le nombre de segments.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.first_lines = []   # Première ligne de chaque segment (ordre d'affichage, croissant)
+        self.last_lines = []    # Ligne suivant la dernière ligne de chaque segment
+        self.times = []         # (start, end) de chaque segment
+        self._sorted = None     # Index temporel construit à la première recherche
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, start, end, first_line, last_line):
+        """Ajoute un segment [start, end] affiché de la ligne `first_line` à `last_line` (exclue)."""
+        self.first_lines.append(first_line)
+        self.last_lines.append(last_line)
+        self.times.append((start, end))
+        self._sorted = None
+
+    def _time_index(self):
+        """Débuts triés, segments correspondants et maximum cumulé des fins (segments éventuellement chevauchants)."""
+        if self._sorted is None:
+            order = sorted(range(len(self.times)), key=lambda i: self.times[i][0])
+            starts = [self.times[i][0] for i in order]
+            max_ends = []
+            current = float("-inf")
+            for i in order:
+                current = max(current, self.times[i][1])
+                max_ends.append(current)
+            self._sorted = (starts, order, max_ends)
+        return self._sorted
+
+    def segment_at_time(self, seconds):
+        """Indice du segment en cours à l'instant `seconds` (le plus récent commencé), ou None dans un silence."""
+        if not self.times:
+            return None
+        starts, order, max_ends = self._time_index()
+        position = bisect_right(starts, seconds) - 1
+        if position < 0 or max_ends[position] <= seconds:
+            return None
+        # Remonter au segment commencé le plus tard qui couvre encore l'instant
+        while self.times[order[position]][1] <= seconds:
+            position -= 1
+        return order[position]
+
+    def segment_at_line(self, line):
+        """Indice du segment affiché à la ligne `line`, ou None."""
+        position = bisect_right(self.first_lines, line) - 1
+        if position < 0 or line >= self.last_lines[position]:
+            return None
+        return position
+
+    def text_range(self, segment):
+        """Indices Tk (début, fin) des lignes d'un segment."""
+        return f"{self.first_lines[segment]}.0", f"{self.last_lines[segment]}.0"
+
+    def start_time(self, segment):
+        return self.times[segment][0]
@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+
+# Répertoire du cache persistant des transcriptions
+CACHE_DIR = os.path.join("cache", "transcriptions")
+
+# Taille maximale du cache sur disque (Mo) ; au-delà, les entrées les moins récemment utilisées sont supprimées
+CACHE_SIZE_LIMIT_MB = 200
+
+_file_hashes = {}  # (chemin absolu, taille, mtime) -> empreinte SHA-256 du contenu
+_cache_lock = threading.Lock()
+
+
+def hash_audio(audio, chunk_size=1 << 20):
+    """Calcule l'empreinte SHA-256 du contenu audio (chemin de fichier ou tableau NumPy)."""
+    if isinstance(audio, np.ndarray):
+        return hashlib.sha256(memoryview(np.ascontiguousarray(audio)).cast("B")).hexdigest()
+
+    stat = os.stat(audio)
+    file_key = (os.path.abspath(audio), stat.st_size, stat.st_mtime)
+    if file_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(audio, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        _file_hashes[file_key] = digest.hexdigest()
+    return _file_hashes[file_key]
+
+
+def make_cache_key(kind, audio, settings):
+    """Construit la clé de cache à partir du contenu audio et des paramètres de traitement."""
+    payload = json.dumps({"kind": kind, "audio": hash_audio(audio), **settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_get(key):
+    """Retourne la valeur en cache pour `key`, ou None si absente."""
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Marquer l'entrée comme récemment utilisée (ordre LRU basé sur la date de modification)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return value
+
+
+def cache_put(key, value):
+    """Enregistre `value` (sérialisable en JSON) puis applique la limite de taille du cache."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(temp_path, path)  # Écriture atomique
+    evict_cache()
+
+
+def evict_cache(limit_mb=None):
+    """Supprime les entrées les moins récemment utilisées jusqu'à respecter la taille limite."""
+    limit_bytes = (CACHE_SIZE_LIMIT_MB if limit_mb is None else limit_mb) * 1024 * 1024
+    with _cache_lock:
+        if not os.path.isdir(CACHE_DIR):
+            return
+        entries = []
+        for entry in os.scandir(CACHE_DIR):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                print(f"Erreur lors de la suppression de {path} : {e}")
+
+
+def cached_call(kind, audio, settings, compute, encode=lambda value: value, decode=lambda value: value):
+    """Retourne le résultat en cache pour (audio, settings) ou l'obtient avec `compute()` et le stocke.
+
+    Args:
+        kind (str): Type de traitement (fait partie de la clé).
+        audio (str | np.ndarray): Chemin du fichier audio ou tableau décodé.
+        settings (dict): Paramètres influençant le résultat (modèle, langue, diarisation...).
+        compute (callable): Fonction calculant le résultat en cas d'absence dans le cache.
+        encode (callable, optional): Conversion du résultat vers une valeur JSON.
+        decode (callable, optional): Conversion inverse d'une valeur JSON lue dans le cache.
+    """
+    key = make_cache_key(kind, audio, settings)
+    value = cache_get(key)
+    if value is not None:
+        print("Résultat trouvé dans le cache des transcriptions.")
+        return decode(value)
+
+    result = compute()
+    if result is not None:
+        try:
+            cache_put(key, encode(result))
+        except (OSError, TypeError) as e:
+            print(f"Erreur lors de l'écriture dans le cache : {e}")
+    return result
@@ -0,0 +1,226 @@
+import math
+import tkinter as tk
+import numpy as np
+
+
+# Couleurs des pistes de locuteurs (attribuées dans l'ordre d'apparition)
+LANE_COLORS = ("#4C9BE8", "#E8A04C", "#6CC070", "#D85C5C", "#A97CD8", "#4CC8C8", "#D8C84C", "#C87CA8")
+
+
+class WaveformView(tk.Canvas):
+    """Forme d'onde zoomable avec une piste colorée par locuteur.
+
+    L'affichage utilise uniquement la pyramide de crêtes précalculée : à chaque rendu, le niveau
+    dont la résolution est juste inférieure à un pixel est choisi, puis ses cases visibles sont
+    réduites par colonne de pixels. L'audio n'est jamais relu.
+
+    Molette : zoom autour du pointeur ; Maj + molette ou glisser : défilement ; clic : positionnement.
+    """
+
+    def __init__(self, master, samplerate=16000, on_seek=None, height=160, lane_height=14, **kwargs):
+        """
+        Args:
+            master: Widget parent.
+            samplerate (int): Fréquence d'échantillonnage de l'audio décrit par la pyramide.
+            on_seek (callable, optional): Appelée avec la position (secondes) cliquée.
+            height (int): Hauteur du canevas.
+            lane_height (int): Hauteur de chaque piste de locuteur.
+        """
+        kwargs.setdefault("bg", "#1E1E1E")
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(master, height=height, **kwargs)
+        self.samplerate = samplerate
+        self.on_seek = on_seek
+        self.lane_height = lane_height
+
+        self.pyramid = {}
+        self.duration = 0.0
+        self.lanes = []  # [locuteur, nom affiché, couleur, débuts triés, fins correspondantes]
+        self.view_start = 0.0
+        self.view_span = 0.0
+        self.position = 0.0
+
+        self.redraw_pending = False
+        self.drag_origin = None
+        self.dragged = False
+
+        self.bind("<Configure>", lambda event: self.schedule_redraw())
+        self.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.bind("<Shift-MouseWheel>", self.on_shift_mouse_wheel)
+        self.bind("<Button-4>", lambda event: self.zoom(0.8, event.x))
+        self.bind("<Button-5>", lambda event: self.zoom(1.25, event.x))
+        self.bind("<Shift-Button-4>", lambda event: self.scroll(-0.1))
+        self.bind("<Shift-Button-5>", lambda event: self.scroll(0.1))
+        self.bind("<ButtonPress-1>", self.on_press)
+        self.bind("<B1-Motion>", self.on_drag)
+        self.bind("<ButtonRelease-1>", self.on_release)
+
+    def set_peaks(self, pyramid, total_samples):
+        """Affiche une nouvelle pyramide de crêtes ({taille de case: (n, 2)}) en vue d'ensemble."""
+        self.pyramid = dict(sorted(pyramid.items()))
+        self.duration = total_samples / self.samplerate
+        self.view_start = 0.0
+        self.view_span = self.duration
+        self.position = 0.0
+        self.schedule_redraw()
+
+    def set_speaker_lanes(self, speaker_intervals):
+        """Définit les pistes de locuteurs à partir de {locuteur: [(start, end), ...]}."""
+        self.lanes = []
+        for index, (speaker, intervals) in enumerate(speaker_intervals.items()):
+            bounds = np.array(sorted(intervals), dtype=np.float64).reshape(-1, 2)
+            self.lanes.append([speaker, speaker, LANE_COLORS[index % len(LANE_COLORS)], bounds[:, 0], bounds[:, 1]])
+        self.schedule_redraw()
+
+    def set_lane_name(self, speaker, name):
+        """Change le nom affiché sur la piste d'un locuteur."""
+        for lane in self.lanes:
+            if lane[0] == speaker:
+                lane[1] = name
+        self.schedule_redraw()
+
+    def clear(self):
+        """Efface la forme d'onde et les pistes."""
+        self.pyramid = {}
+        self.lanes = []
+        self.duration = 0.0
+        self.delete("all")
+
+    def set_position(self, seconds):
+        """Déplace le curseur de lecture, en faisant défiler la vue s'il en sort."""
+        self.position = seconds
+        if self.view_span and not self.view_start <= seconds <= self.view_start + self.view_span:
+            self.view_start = self.clamp_start(seconds - 0.1 * self.view_span)
+            self.schedule_redraw()
+        else:
+            self.draw_playhead()
+
+    def schedule_redraw(self):
+        """Regroupe les demandes de rendu en un seul rendu à la prochaine inactivité de Tk."""
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def time_to_x(self, seconds):
+        return (seconds - self.view_start) / self.view_span * self.winfo_width()
+
+    def x_to_time(self, x):
+        return self.view_start + x / max(self.winfo_width(), 1) * self.view_span
+
+    def clamp_start(self, start):
+        return min(max(start, 0.0), max(self.duration - self.view_span, 0.0))
+
+    def zoom(self, factor, x):
+        """Zoome d'un facteur `factor` sur la durée visible, en gardant fixe l'instant sous le pointeur."""
+        if not self.duration:
+            return
+        anchor = self.x_to_time(x)
+        min_span = 4 * self.winfo_width() / self.samplerate  # Au plus 4 pixels par échantillon
+        self.view_span = min(max(self.view_span * factor, min_span), self.duration)
+        self.view_start = self.clamp_start(anchor - x / max(self.winfo_width(), 1) * self.view_span)
+        self.schedule_redraw()
+
+    def scroll(self, fraction):
+        """Fait défiler la vue d'une fraction de la durée visible."""
+        if self.duration:
+            self.view_start = self.clamp_start(self.view_start + fraction * self.view_span)
+            self.schedule_redraw()
+
+    def on_mouse_wheel(self, event):
+        self.zoom(0.8 if event.delta > 0 else 1.25, event.x)
+
+    def on_shift_mouse_wheel(self, event):
+        self.scroll(-0.1 if event.delta > 0 else 0.1)
+
+    def on_press(self, event):
+        self.drag_origin = (event.x, self.view_start)
+        self.dragged = False
+
+    def on_drag(self, event):
+        if self.drag_origin is None or not self.duration:
+            return
+        origin_x, origin_start = self.drag_origin
+        if abs(event.x - origin_x) > 3:
+            self.dragged = True
+        if self.dragged:
+            shift = (origin_x - event.x) / max(self.winfo_width(), 1) * self.view_span
+            self.view_start = self.clamp_start(origin_start + shift)
+            self.schedule_redraw()
+
+    def on_release(self, event):
+        if not self.dragged and self.duration and self.on_seek is not None:
+            self.on_seek(min(max(self.x_to_time(event.x), 0.0), self.duration))
+        self.drag_origin = None
+
+    def visible_peaks(self, width):
+        """Crêtes (x, min, max) par colonne de pixels pour la vue courante."""
+        samples_per_pixel = self.view_span * self.samplerate / width
+        sizes = list(self.pyramid)
+        size = max((s for s in sizes if s <= samples_per_pixel), default=sizes[0])
+        peaks = self.pyramid[size]
+
+        first = int(self.view_start * self.samplerate / size)
+        last = min(math.ceil((self.view_start + self.view_span) * self.samplerate / size) + 1, len(peaks))
+        bins = peaks[first:last]
+        if len(bins) == 0:
+            return None
+
+        # Regrouper les cases tombant dans la même colonne de pixels
+        times = (np.arange(first, first + len(bins)) + 0.5) * size / self.samplerate
+        columns = np.clip(((times - self.view_start) / self.view_span * width).astype(np.int64), 0, width - 1)
+        starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+        return (columns[starts], np.minimum.reduceat(bins[:, 0], starts),
+                np.maximum.reduceat(bins[:, 1], starts))
+
+    def redraw(self):
+        """Redessine les pistes, la forme d'onde et le curseur pour la vue courante."""
+        self.redraw_pending = False
+        self.delete("all")
+        width, height = self.winfo_width(), self.winfo_height()
+        if not self.pyramid or not self.view_span or width < 2:
+            return
+
+        view_end = self.view_start + self.view_span
+
+        # Pistes de locuteurs : seuls les intervalles visibles sont dessinés
+        for lane, (_, name, color, starts, ends) in enumerate(self.lanes):
+            top = 2 + lane * self.lane_height
+            first = np.searchsorted(ends, self.view_start, side="right")
+            last = np.searchsorted(starts, view_end, side="left")
+            for start, end in zip(starts[first:last], ends[first:last]):
+                x0, x1 = self.time_to_x(start), self.time_to_x(end)
+                self.create_rectangle(x0, top, max(x1, x0 + 1), top + self.lane_height - 3, fill=color, width=0)
+            self.create_text(4, top, text=name, anchor="nw", fill="white", font=("Arial", 8))
+
+        # Forme d'onde sous les pistes : un seul polygone (contour des maxima puis des minima)
+        lanes_bottom = 4 + len(self.lanes) * self.lane_height
+        middle = (lanes_bottom + height) / 2
+        half = (height - lanes_bottom) / 2 - 2
+        visible = self.visible_peaks(width)
+        if visible is not None:
+            xs, mins, maxs = visible
+            top = np.column_stack([xs, middle - np.clip(maxs, -1, 1) * half])
+            bottom = np.column_stack([xs, middle - np.clip(mins, -1, 1) * half])[::-1]
+            points = np.concatenate([top, bottom])
+            if len(points) >= 3:
+                self.create_polygon(*points.ravel().tolist(), fill="#7FA7D9", outline="#7FA7D9")
+
+        # Bornes de la vue
+        self.create_text(4, height - 2, text=self.format_time(self.view_start), anchor="sw", fill="gray",
+                         font=("Arial", 8))
+        self.create_text(width - 4, height - 2, text=self.format_time(view_end), anchor="se", fill="gray",
+                         font=("Arial", 8))
+        self.draw_playhead()
+
+    def draw_playhead(self):
+        """Place le curseur de lecture sans redessiner le reste."""
+        self.delete("playhead")
+        if self.view_span:
+            x = self.time_to_x(self.position)
+            self.create_line(x, 0, x, self.winfo_height(), fill="white", tags="playhead")
+
+    @staticmethod
+    def format_time(seconds):
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"